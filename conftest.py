@@ -0,0 +1,6 @@
+import sys
+
+# The doctests of memory_report need sys.getsizeof, which is CPython-specific.
+collect_ignore = []
+if sys.implementation.name != "cpython":
+    collect_ignore.append("constantdict/memory.py")
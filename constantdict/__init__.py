@@ -28,26 +28,91 @@ SOFTWARE.
 """
 
 import sys
+import typing
 from collections.abc import Iterable, Mapping
+from collections.abc import Set as AbstractSet
 from typing import (  # <3.9 needs Dict, not dict
     TYPE_CHECKING,
     Any,
     Dict,
     Hashable,
+    NamedTuple,
     TypeVar,
 )
 
-if sys.version_info >= (3, 8):
-    import importlib.metadata as importlib_metadata
+if TYPE_CHECKING:  # pragma: no cover
+    from collections.abc import Callable, ItemsView, Iterator, ValuesView
     from typing import Literal
-else:  # pragma: no cover
-    import importlib_metadata  # type: ignore[no-redef]
-    from typing_extensions import Literal
 
-if TYPE_CHECKING:  # pragma: no cover
     from _typeshed import SupportsKeysAndGetItem
 
-__version__ = importlib_metadata.version(__package__ or __name__)
+    from constantdict.batch import dedupe as dedupe
+    from constantdict.batch import hash_many as hash_many
+    from constantdict.frozen import freeze as freeze
+    from constantdict.frozen import freeze_gc as freeze_gc
+    from constantdict.frozen import gc_paused as gc_paused
+    from constantdict.index import ConstantDictIndex as ConstantDictIndex
+    from constantdict.json import dump_json as dump_json
+    from constantdict.json import dumps_json as dumps_json
+    from constantdict.json import load_json as load_json
+    from constantdict.json import loads_json as loads_json
+    from constantdict.memory import MemoryReport as MemoryReport
+    from constantdict.memory import memory_report as memory_report
+    from constantdict.overlay import constantdictoverlay as constantdictoverlay
+    from constantdict.profiling import _Profiler
+    from constantdict.profiling import disable_profiling as disable_profiling
+    from constantdict.profiling import enable_profiling as enable_profiling
+    from constantdict.profiling import profiling_report as profiling_report
+    from constantdict.ref import ConstantDictRef as ConstantDictRef
+
+
+# The active profiler, see constantdict.profiling.enable_profiling().
+_profiler: _Profiler | None = None
+
+
+# Public names defined in submodules, which are only imported on first access.
+_LAZY_ATTRIBUTES = {
+    "dedupe": "constantdict.batch",
+    "hash_many": "constantdict.batch",
+    "freeze": "constantdict.frozen",
+    "freeze_gc": "constantdict.frozen",
+    "gc_paused": "constantdict.frozen",
+    "ConstantDictIndex": "constantdict.index",
+    "dump_json": "constantdict.json",
+    "dumps_json": "constantdict.json",
+    "load_json": "constantdict.json",
+    "loads_json": "constantdict.json",
+    "MemoryReport": "constantdict.memory",
+    "memory_report": "constantdict.memory",
+    "constantdictoverlay": "constantdict.overlay",
+    "disable_profiling": "constantdict.profiling",
+    "enable_profiling": "constantdict.profiling",
+    "profiling_report": "constantdict.profiling",
+    "ConstantDictRef": "constantdict.ref",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve module attributes lazily to keep ``import constantdict`` fast."""
+    if name in _LAZY_ATTRIBUTES:
+        from importlib import import_module
+
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+
+    if name == "__version__":
+        # Looking up the distribution metadata is slow, so only do it on demand.
+        if sys.version_info >= (3, 8):
+            import importlib.metadata as importlib_metadata
+        else:  # pragma: no cover
+            import importlib_metadata
+
+        version = importlib_metadata.version(__package__ or __name__)
+        globals()["__version__"] = version
+        return version
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 K = TypeVar("K", bound=Hashable)
@@ -58,13 +123,154 @@ class _NotProvided:
     pass
 
 
+# Types whose instances can not change after creation. Subclasses are
+# deliberately excluded, as they might add mutable state.
+_IMMUTABLE_TYPES = frozenset({
+    type(None), type(Ellipsis), type(NotImplemented),
+    bool, int, float, complex, str, bytes, range,
+})
+
+
+def _is_immutable(obj: Any) -> bool:
+    """Return *True* if *obj* is known to be (deeply) immutable."""
+    tp = type(obj)
+    if tp in _IMMUTABLE_TYPES:
+        return True
+    if tp is tuple or tp is frozenset:
+        return all(_is_immutable(item) for item in obj)
+    if isinstance(obj, constantdict):
+        return obj._has_immutable_contents()
+    return False
+
+
+# type-ignore-reason: covariant type incompatible with Dict
+class _constantdictslots(Dict[K, V]):  # type: ignore[type-var]
+    """Common base class of :class:`constantdict` and
+    :class:`constantdictmutation` (and their subclasses), which stores the
+    caches in slots instead of a per-instance ``__dict__``, which would more
+    than double the size of small dictionaries.
+
+    :meth:`constantdictmutation.finish` changes the class of an instance
+    without copying, which requires both classes to have the same layout.
+    Subclasses should therefore declare ``__slots__ = ()`` on both classes of
+    a pair, since a subclass without ``__slots__`` gets a ``__dict__`` and
+    hence a different layout. :meth:`constantdictmutation.finish` falls back
+    to copying in that case.
+    """
+
+    __slots__ = ("__weakref__", "_digest", "_hash", "_immutable",
+                 "_partial_hash")
+
+
+def _finish(self: Any, cls: type[Any]) -> Any:
+    """Change the class of *self* to *cls*, or return a copy of *self* as a
+    *cls* if the layouts of the classes differ."""
+    try:
+        self.__class__ = cls
+    except TypeError:
+        return cls(self)
+    return self
+
+
 def _del_attr(self: Any, *args: Any, **kwargs: Any) -> None:
     """Raise an AttributeError when trying to modify the object."""
     raise AttributeError(f"{self.__class__.__name__} object is immutable")
 
 
-# type-ignore-reason: covariant type incompatible with Dict
-class constantdict(Dict[K, V]):  # type: ignore[type-var]
+def _items_contained(small: Mapping[Any, Any], large: Mapping[Any, Any]) -> bool:
+    """Return *True* if all items of *small* are also items of *large*, with
+    ``len(small) <= len(large)``."""
+    if len(small) == len(large):
+        # Differing (cached) hashes prove that the mappings are not equal.
+        small_hash = getattr(small, "_hash", None)
+        large_hash = getattr(large, "_hash", None)
+        if (small_hash is not None and large_hash is not None
+                and small_hash != large_hash):
+            return False
+        # Same length: containment is the same as equality, which
+        # dict implements in C.
+        return small == large
+
+    # Iterates over the items of *small* only.
+    return small.items() <= large.items()
+
+
+# {{{ nested paths
+
+def _split_paths(updates: Iterable[tuple[tuple[Any, ...], Any]]) \
+        -> tuple[dict[Any, Any], dict[Any, list[tuple[tuple[Any, ...], Any]]]]:
+    """Split *updates* (pairs of paths and values) into the values for paths
+    of length one, and the updates of the subtrees for longer paths, both
+    indexed by the first key of the path."""
+    direct: dict[Any, Any] = {}
+    nested: dict[Any, list[tuple[tuple[Any, ...], Any]]] = {}
+
+    for path, value in updates:
+        if not path:
+            raise ValueError("path must not be empty")
+        key = path[0]
+        if len(path) == 1:
+            direct[key] = value
+        else:
+            nested.setdefault(key, []).append((path[1:], value))
+
+    for key in direct:
+        if key in nested:
+            raise ValueError(f"conflicting paths for key {key!r}")
+
+    return direct, nested
+
+# }}}
+
+
+# {{{ canonical encoding for digest()
+
+def _encode_int(obj: int) -> bytes:
+    return b"i" + str(obj).encode()
+
+
+def _encode_float(obj: float) -> bytes:
+    # Adding 0.0 normalizes -0.0 to 0.0, which compare equal.
+    return b"f" + (obj + 0.0).hex().encode()
+
+
+def _encode_complex(obj: complex) -> bytes:
+    return b"c" + _encode_float(obj.real) + _encode_float(obj.imag)
+
+
+# Fast path: encoders for common primitive types, looked up by exact type.
+_DIGEST_ENCODERS: dict[type, Any] = {
+    str: lambda obj: b"s" + obj.encode("utf-8", "surrogatepass"),
+    bytes: lambda obj: b"b" + obj,
+    int: _encode_int,
+    bool: lambda obj: b"T" if obj else b"F",
+    type(None): lambda obj: b"N",
+    float: _encode_float,
+    complex: _encode_complex,
+}
+
+
+def _digest_encode(obj: Any) -> bytes:
+    """Return a canonical, length-prefixed byte encoding of *obj* that does
+    not depend on the hash seed or on insertion order."""
+    encoder = _DIGEST_ENCODERS.get(type(obj))
+    if encoder is not None:
+        payload: bytes = encoder(obj)
+    elif type(obj) is tuple:
+        payload = b"t" + b"".join(_digest_encode(item) for item in obj)
+    elif type(obj) is frozenset:
+        payload = b"S" + b"".join(sorted(_digest_encode(item) for item in obj))
+    elif isinstance(obj, constantdict):
+        payload = b"d" + obj.digest()
+    else:
+        raise TypeError(f"cannot compute a digest of type '{type(obj).__name__}'")
+
+    return len(payload).to_bytes(8, "little") + payload
+
+# }}}
+
+
+class constantdict(_constantdictslots[K, V]):
     """An immutable dictionary that does not allow modifications after
     creation. This class behaves mostly like a :class:`dict`,
     but with the following differences.
@@ -72,7 +278,10 @@ class constantdict(Dict[K, V]):  # type: ignore[type-var]
     .. rubric:: Additional methods compared to :class:`dict`
 
     .. automethod:: __hash__
+    .. automethod:: __deepcopy__
+    .. automethod:: digest
     .. automethod:: mutate
+    .. automethod:: derive
 
     .. rubric:: Methods that return a modified copy of a :class:`constantdict`
 
@@ -82,6 +291,35 @@ class constantdict(Dict[K, V]):  # type: ignore[type-var]
     .. automethod:: update
     .. automethod:: discard
 
+    .. rubric:: Methods that transform all items of a :class:`constantdict`
+
+    .. automethod:: map_values
+    .. automethod:: map_keys
+    .. automethod:: filter_items
+    .. automethod:: partition
+
+    .. rubric:: Set operations on keys
+
+    .. automethod:: __and__
+    .. automethod:: __sub__
+    .. automethod:: __xor__
+    .. automethod:: restrict
+    .. automethod:: without
+
+    .. rubric:: Methods that return a modified copy of a nested :class:`constantdict`
+
+    .. automethod:: get_in
+    .. automethod:: set_in
+    .. automethod:: update_in
+    .. automethod:: delete_in
+    .. automethod:: apply_paths
+
+    .. rubric:: Comparisons with other mappings
+
+    .. automethod:: issubmapping
+    .. automethod:: issupermapping
+    .. automethod:: isdisjoint_keys
+
     .. rubric:: Deleted methods compared to :class:`dict`
 
     These methods raise an :exc:`AttributeError` when called.
@@ -91,8 +329,18 @@ class constantdict(Dict[K, V]):  # type: ignore[type-var]
     .. method:: clear
     .. method:: popitem
     .. method:: pop
+
+    .. rubric:: Subclassing
+
+    Instances store their caches in slots and do not accept other
+    attributes. Subclasses (and their :class:`constantdictmutation`
+    counterparts) should declare ``__slots__ = ()``, so that
+    :meth:`constantdictmutation.finish` can convert between them without
+    copying.
     """
 
+    __slots__ = ()
+
     @staticmethod
     def fromkeys(iterable: Iterable[K],  # type: ignore[override]
                  value: V | None = None) -> constantdict[K, V | Any]:
@@ -109,9 +357,49 @@ class constantdict(Dict[K, V]):  # type: ignore[type-var]
         try:
             return self._hash
         except AttributeError:
-            self._hash: int = hash(frozenset(self.items()))
+            if _profiler is not None:
+                self._hash: int = _profiler.call(
+                    "hash", self, lambda: hash(frozenset(self.items())))
+            else:
+                self._hash = hash(frozenset(self.items()))
             return self._hash
 
+    def digest(self) -> bytes:
+        """Return a cryptographic digest (BLAKE2b, 32 bytes) of the items of
+        this :class:`constantdict`. Once computed, the digest is cached.
+
+        In contrast to :meth:`__hash__`, the digest is stable across Python
+        processes (it does not depend on ``PYTHONHASHSEED``), and can therefore
+        be used as a key in shared or persistent caches. It is independent of
+        the insertion order of the items.
+
+        Keys and values must be :class:`str`, :class:`bytes`, :class:`int`,
+        :class:`bool`, :class:`float`, :class:`complex`, *None*, or
+        :class:`tuple`, :class:`frozenset` or :class:`constantdict` instances
+        containing these types (subclasses of these types are not supported).
+        Values that compare equal, but have different types (such as ``1``
+        and ``1.0``), result in different digests.
+
+        .. doctest::
+
+            >>> constantdict(a=1, b=2).digest() == constantdict(b=2, a=1).digest()
+            True
+            >>> constantdict(a=1).digest().hex()[:16]
+            'ff3ded0c025d761f'
+        """
+        try:
+            return self._digest
+        except AttributeError:
+            from hashlib import blake2b
+
+            h = blake2b(digest_size=32)
+            for item in sorted(_digest_encode(k) + _digest_encode(v)
+                               for k, v in self.items()):
+                h.update(item)
+
+            self._digest: bytes = h.digest()
+            return self._digest
+
     def __repr__(self) -> str:
         """Return a string representation of this :class:`constantdict`."""
         return f"{self.__class__.__name__}({dict(self)!r})"
@@ -141,19 +429,69 @@ class constantdict(Dict[K, V]):  # type: ignore[type-var]
             """Return the union of this :class:`constantdict` and *other*."""
             # Note that the only difference to __or__ is that this method accepts
             # different types of *other*.
+            if _transition_cache is not None and isinstance(other, constantdict):
+                return _transition_cache.derive(self, "or", other)
+
             d = self.mutate()
             d.update(other)
             return d.finish()
 
-    def copy(self) -> dict[K, V]:
-        """Return a shallow copy of this :class:`constantdict`."""
-        return self.__class__(self)
+    def copy(self) -> constantdict[K, V]:
+        """Return a shallow copy of this :class:`constantdict`.
+
+        Since a :class:`constantdict` can not be modified, this returns a
+        reference to itself.
+        """
+        return self
+
+    def __copy__(self) -> constantdict[K, V]:
+        """Return a reference to itself, see :meth:`copy`."""
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> constantdict[K, V]:
+        """Return a deep copy of this :class:`constantdict`.
+
+        Return a reference to itself if all keys and values are known to be
+        immutable (this check is cached). Otherwise, only the mutable parts
+        are copied.
+        """
+        if self._has_immutable_contents():
+            return self
+
+        from copy import deepcopy
+
+        if (type(self).mutate is constantdict.mutate
+                and type(self) is not constantdict):
+            # Subclasses without their own mutate() would be copied to a plain
+            # constantdict below, so copy them as via __reduce__ instead.
+            return self.__class__(deepcopy(dict(self), memo))
+
+        # Register the (still empty) result before copying the items, in case
+        # a mutable value refers back to this constantdict.
+        d: constantdictmutation[K, V] = self.__class__().mutate()
+        memo[id(self)] = d
+        for k, v in self.items():
+            d[deepcopy(k, memo)] = deepcopy(v, memo)
+        return d.finish()
+
+    def _has_immutable_contents(self) -> bool:
+        """Return *True* if all keys and values of this :class:`constantdict`
+        are known to be immutable. Once computed, the result is cached."""
+        try:
+            return self._immutable
+        except AttributeError:
+            self._immutable: bool = all(_is_immutable(k) and _is_immutable(v)
+                                        for k, v in self.items())
+            return self._immutable
 
     # {{{ methods that return a modified copy of the dictionary
 
     # value: Any due to https://github.com/python/mypy/issues/7049
     def set(self, key: K, value: Any) -> constantdict[K, V]:
         """Return a new :class:`constantdict` with the item at *key* set to *val*."""
+        if _transition_cache is not None:
+            return _transition_cache.derive(self, "set", key, value)
+
         d = self.mutate()
         d[key] = value
         return d.finish()
@@ -178,6 +516,9 @@ class constantdict(Dict[K, V]):  # type: ignore[type-var]
 
         Raise a :exc:`KeyError` if *key* is not present.
         """
+        if _transition_cache is not None:
+            return _transition_cache.derive(self, "delete", key)
+
         d = self.mutate()
         del d[key]
         return d.finish()
@@ -229,6 +570,361 @@ class constantdict(Dict[K, V]):  # type: ignore[type-var]
 
     # }}}
 
+    # {{{ methods that transform all items
+
+    def map_values(self, func: Callable[[V], Any]) -> constantdict[K, Any]:
+        """Return a new :class:`constantdict` with *func* applied to each value.
+
+        Return a reference to itself if *func* returns each value unchanged
+        (i.e., the same object).
+        """
+        d: constantdictmutation[K, Any] = self.__class__().mutate()
+        changed = False
+        for k, v in self.items():
+            new_v = func(v)
+            if new_v is not v:
+                changed = True
+            d[k] = new_v
+
+        if not changed:
+            return self
+        return d.finish()
+
+    def map_keys(self, func: Callable[[K], Any]) -> constantdict[Any, V]:
+        """Return a new :class:`constantdict` with *func* applied to each key.
+
+        If *func* maps several keys to the same new key, the value of the last
+        of them is kept. Return a reference to itself if *func* returns each
+        key unchanged (i.e., the same object).
+        """
+        d: constantdictmutation[Any, V] = self.__class__().mutate()
+        changed = False
+        for k, v in self.items():
+            new_k = func(k)
+            if new_k is not k:
+                changed = True
+            d[new_k] = v
+
+        if not changed:
+            return self
+        return d.finish()
+
+    def filter_items(self, pred: Callable[[K, V], Any]) -> constantdict[K, V]:
+        """Return a new :class:`constantdict` with the items for which
+        ``pred(key, value)`` is true.
+
+        Return a reference to itself if *pred* is true for all items.
+        """
+        d: constantdictmutation[K, V] = self.__class__().mutate()
+        for k, v in self.items():
+            if pred(k, v):
+                d[k] = v
+
+        if len(d) == len(self):
+            return self
+        return d.finish()
+
+    def partition(self, pred: Callable[[K, V], Any]) \
+            -> tuple[constantdict[K, V], constantdict[K, V]]:
+        """Return a tuple of two :class:`constantdict` instances with the items
+        for which ``pred(key, value)`` is true and false, respectively.
+
+        If *pred* is true (or false) for all items, the respective part is a
+        reference to itself.
+
+        .. doctest::
+
+            >>> cd = constantdict(a=1, b=2, c=3)
+            >>> cd.partition(lambda k, v: v % 2)
+            (constantdict({'a': 1, 'c': 3}), constantdict({'b': 2}))
+        """
+        true: constantdictmutation[K, V] = self.__class__().mutate()
+        false: constantdictmutation[K, V] = self.__class__().mutate()
+        for k, v in self.items():
+            if pred(k, v):
+                true[k] = v
+            else:
+                false[k] = v
+
+        if not false:
+            return self, false.finish()
+        if not true:
+            return true.finish(), self
+        return true.finish(), false.finish()
+
+    # }}}
+
+    # {{{ set operations on keys
+
+    def restrict(self, keys: Iterable[Any]) -> constantdict[K, V]:
+        """Return a new :class:`constantdict` with only the items whose key is
+        in *keys*.
+
+        Only the smaller of this :class:`constantdict` and *keys* is iterated
+        over. Return a reference to itself if all keys are in *keys*.
+
+        .. note::
+
+            If *keys* is smaller, the items of the result are in the order of
+            *keys* and use its key objects (e.g. ``1.0`` instead of an equal
+            ``1``). Otherwise, they are in the order of this
+            :class:`constantdict`. Use a sequence or a mapping for *keys* if
+            the order matters, since the iteration order of a set can depend
+            on the hash seed.
+        """
+        if not isinstance(keys, (Mapping, AbstractSet)):
+            # Remove duplicates, but keep the order of the keys
+            keys = dict.fromkeys(keys)
+
+        d: constantdictmutation[K, V] = self.__class__().mutate()
+        if len(keys) < len(self):
+            for k in keys:
+                if k in self:
+                    d[k] = self[k]
+        else:
+            for k, v in self.items():
+                if k in keys:
+                    d[k] = v
+
+        if len(d) == len(self):
+            return self
+        return d.finish()
+
+    def without(self, keys: Iterable[Any]) -> constantdict[K, V]:
+        """Return a new :class:`constantdict` without the items whose key is
+        in *keys*. Keys that are not present are ignored.
+
+        Only the smaller of this :class:`constantdict` and *keys* is iterated
+        over. Return a reference to itself if no key is in *keys*.
+        """
+        if not isinstance(keys, (Mapping, AbstractSet)):
+            keys = set(keys)
+
+        if len(keys) < len(self):
+            result: constantdictmutation[K, V] | None = None
+            for k in keys:
+                if k in self:
+                    if result is None:
+                        result = self.mutate()
+                    del result[k]
+            return self if result is None else result.finish()
+
+        d: constantdictmutation[K, V] = self.__class__().mutate()
+        for k, v in self.items():
+            if k not in keys:
+                d[k] = v
+
+        if len(d) == len(self):
+            return self
+        return d.finish()
+
+    def __and__(self, other: Mapping[Any, Any]) -> constantdict[K, V]:
+        """Return a new :class:`constantdict` with the items of this
+        :class:`constantdict` whose key is in *other*. See :meth:`restrict`
+        for the order and key objects of the result."""
+        if not isinstance(other, Mapping):
+            raise TypeError("unsupported operand type(s) for &: "
+                            f"'{type(self).__name__}' and '{type(other).__name__}'")
+        return self.restrict(other)
+
+    def __sub__(self,
+                other: Mapping[Any, Any] | AbstractSet[Any]) -> constantdict[K, V]:
+        """Return a new :class:`constantdict` with the items of this
+        :class:`constantdict` whose key is not in *other*, which can be a
+        mapping or a set of keys, see :meth:`without`."""
+        if not isinstance(other, (Mapping, AbstractSet)):
+            raise TypeError("unsupported operand type(s) for -: "
+                            f"'{type(self).__name__}' and '{type(other).__name__}'")
+        return self.without(other)
+
+    def __xor__(self, other: Mapping[K, V]) -> constantdict[K, V]:
+        """Return a new :class:`constantdict` with the items of this
+        :class:`constantdict` and *other* whose key is in only one of them.
+
+        Return a reference to itself if *other* is empty, and *other* if this
+        :class:`constantdict` is empty and *other* is of the same type.
+        """
+        if not isinstance(other, Mapping):
+            raise TypeError("unsupported operand type(s) for ^: "
+                            f"'{type(self).__name__}' and '{type(other).__name__}'")
+        if not other:
+            return self
+        if not self and type(other) is type(self):
+            return other
+
+        d: constantdictmutation[K, V] = self.__class__().mutate()
+        for k, v in self.items():
+            if k not in other:
+                d[k] = v
+        for k, v in other.items():
+            if k not in self:
+                d[k] = v
+        return d.finish()
+
+    # }}}
+
+    # {{{ methods that return a modified copy of a nested dictionary
+
+    def get_in(self, path: Iterable[Any], default: Any = _NotProvided) -> Any:
+        """Return the value at *path* (a sequence of keys) in a tree of nested
+        :class:`constantdict` instances.
+
+        Return *default* if *path* is not present, or raise a :exc:`KeyError`
+        if no *default* is given.
+        """
+        path = tuple(path)
+        node: Any = self
+        try:
+            for key in path:
+                node = node[key]
+        except (IndexError, KeyError, TypeError):
+            if default is _NotProvided:
+                raise KeyError(path) from None
+            return default
+        return node
+
+    def set_in(self, path: Iterable[Any], value: Any) -> constantdict[K, V]:
+        """Return a new :class:`constantdict` with the value at *path* (a
+        sequence of keys) set to *value*. Missing intermediate dictionaries
+        are created.
+
+        Only the dictionaries along *path* are copied; all other subtrees
+        (and their cached hashes) are shared with this :class:`constantdict`.
+        Return a reference to itself if the value at *path* is already
+        *value*.
+
+        .. doctest::
+
+            >>> cd = constantdict(a=constantdict(b=constantdict(c=1)), x=2)
+            >>> cd.set_in(("a", "b", "c"), 10)
+            constantdict({'a': constantdict({'b': constantdict({'c': 10})}), 'x': 2})
+        """
+        return self._apply_paths([(tuple(path), value)])
+
+    def update_in(self, path: Iterable[Any], func: Callable[[Any], Any],
+                  default: Any = _NotProvided) -> constantdict[K, V]:
+        """Return a new :class:`constantdict` with the value *v* at *path*
+        replaced by ``func(v)``. If *path* is not present, *default* is
+        passed to *func* instead, or a :exc:`KeyError` is raised if no
+        *default* is given. See :meth:`set_in` for details.
+        """
+        path = tuple(path)
+        return self.set_in(path, func(self.get_in(path, default)))
+
+    def delete_in(self, path: Iterable[Any]) -> constantdict[K, V]:
+        """Return a new :class:`constantdict` without the item at *path* (a
+        sequence of keys). Raise a :exc:`KeyError` if *path* is not present.
+        See :meth:`set_in` for details.
+        """
+        path = tuple(path)
+        if not path:
+            raise ValueError("path must not be empty")
+
+        key, *rest = path
+        if not rest:
+            return self.delete(key)
+
+        child = self[key]
+        if not isinstance(child, constantdict):
+            raise TypeError(f"value at key {key!r} is not a constantdict, "
+                            f"but '{type(child).__name__}'")
+        return self.set(key, child.delete_in(rest))
+
+    def apply_paths(self, updates: Mapping[tuple[Any, ...], Any]) -> constantdict[K, V]:
+        """Return a new :class:`constantdict` with the values at all paths
+        (tuples of keys) in *updates* set to the corresponding values.
+
+        Each dictionary along the paths is copied exactly once, even if
+        multiple paths go through it. See :meth:`set_in` for details.
+
+        .. doctest::
+
+            >>> cd = constantdict(a=constantdict(b=1, c=2), x=3)
+            >>> cd.apply_paths({("a", "b"): 10, ("a", "c"): 20, ("y",): 4})
+            constantdict({'a': constantdict({'b': 10, 'c': 20}), 'x': 3, 'y': 4})
+        """
+        return self._apply_paths(list(updates.items()))
+
+    def _apply_paths(self, updates: list[tuple[tuple[Any, ...], Any]]
+                     ) -> constantdict[K, V]:
+        direct, nested = _split_paths(updates)
+        missing = _NotProvided
+
+        changes: dict[Any, Any] = {key: value for key, value in direct.items()
+                                   if self.get(key, missing) is not value}
+
+        for key, child_updates in nested.items():
+            old_child: Any = self.get(key, missing)
+            if old_child is missing:
+                child: constantdict[Any, Any] = self.__class__()
+            elif isinstance(old_child, constantdict):
+                child = old_child
+            else:
+                raise TypeError(f"value at key {key!r} is not a constantdict, "
+                                f"but '{type(old_child).__name__}'")
+
+            new_child = child._apply_paths(child_updates)
+            if new_child is not old_child:
+                changes[key] = new_child
+
+        if not changes:
+            return self
+
+        d = self.mutate()
+        d.update(changes)
+        return d.finish()
+
+    # }}}
+
+    # {{{ comparisons with other mappings
+
+    def issubmapping(self, other: Mapping[Any, Any]) -> bool:
+        """Return *True* if all items of this :class:`constantdict` are also
+        items of *other*. This is equivalent to
+        ``self.items() <= other.items()``, but faster.
+
+        .. doctest::
+
+            >>> constantdict(a=1).issubmapping({"a": 1, "b": 2})
+            True
+            >>> constantdict(a=1).issubmapping({"a": 2, "b": 2})
+            False
+        """
+        if self is other:
+            return True
+        if len(self) > len(other):
+            return False
+        return _items_contained(self, other)
+
+    def issupermapping(self, other: Mapping[Any, Any]) -> bool:
+        """Return *True* if all items of *other* are also items of this
+        :class:`constantdict`. This is equivalent to
+        ``self.items() >= other.items()``, but faster.
+        """
+        if self is other:
+            return True
+        if len(other) > len(self):
+            return False
+        return _items_contained(other, self)
+
+    def isdisjoint_keys(self, other: Iterable[Any]) -> bool:
+        """Return *True* if this :class:`constantdict` and *other* (a mapping
+        or an iterable of keys) have no keys in common. This is equivalent to
+        ``self.keys().isdisjoint(other)``, but iterates over the smaller
+        operand if *other* is a mapping.
+        """
+        if self is other:
+            return not self
+
+        if isinstance(other, Mapping) and len(other) > len(self):
+            small, large = self, other
+        else:
+            small, large = other, self  # type: ignore[assignment]
+
+        return not any(k in large for k in small)
+
+    # }}}
+
     # {{{ deleted methods
 
     __delitem__ = _del_attr
@@ -277,13 +973,34 @@ class constantdict(Dict[K, V]):  # type: ignore[type-var]
         """
         # This needs to make a copy since the original dictionary must
         # not be modified.
+        if _profiler is not None:
+            return _profiler.call("copy", self, constantdictmutation, self)
         return constantdictmutation(self)
 
+    def derive(self) -> constantdictderivation[K, V]:
+        """Return a :class:`constantdictderivation` that records chained
+        modifications of this :class:`constantdict` and applies them with a
+        single copy when the result is first needed.
+
+        Chains of :meth:`set`, :meth:`delete`, :meth:`discard`, :meth:`update`
+        and :meth:`setdefault` copy the whole dictionary for each call. The
+        same chain on a derivation only copies once, with identical results:
+
+        .. doctest::
+
+            >>> cd = constantdict(a=1, b=2, c=3)
+            >>> cd_new = cd.derive().set("a", 10).delete("c").update(d=4).finish()
+            >>> cd_new
+            constantdict({'a': 10, 'b': 2, 'd': 4})
+            >>> cd  # unchanged
+            constantdict({'a': 1, 'b': 2, 'c': 3})
+        """
+        return constantdictderivation(self)
+
     # }}}
 
 
-# type-ignore-reason: covariant type incompatible with Dict
-class constantdictmutation(Dict[K, V]):  # type: ignore[type-var]
+class constantdictmutation(_constantdictslots[K, V]):
     """A mutable dictionary that can be converted back to a
     :class:`constantdict` without copying. This class behaves exactly like a
     :class:`dict`, except for the addition mentioned below.
@@ -291,8 +1008,17 @@ class constantdictmutation(Dict[K, V]):  # type: ignore[type-var]
     .. rubric:: Additional method compared to :class:`dict`
 
     .. automethod:: finish
+
+    .. rubric:: Subclassing
+
+    Subclasses should declare ``__slots__ = ()``, as should the
+    :class:`constantdict` subclass they convert to, since :meth:`finish`
+    can only change the class of an instance if both classes have the same
+    layout. Otherwise, :meth:`finish` returns a copy.
     """
 
+    __slots__ = ()
+
     def __enter__(self) -> constantdictmutation[K, V]:
         return self
 
@@ -310,8 +1036,157 @@ class constantdictmutation(Dict[K, V]):  # type: ignore[type-var]
             >>> cd
             constantdict({'a': 12, 'b': 2})
         """
-        self.__class__ = constantdict  # type: ignore[assignment]
-        return self  # type: ignore[return-value]
+        return _finish(self, constantdict)  # type: ignore[no-any-return]
+
+
+class constantdictderivation(typing.Mapping[K, V]):  # <3.9 needs typing.Mapping
+    """A deferred :class:`constantdict` that records modifications and applies
+    all of them with a single copy of the original dictionary. Instances are
+    created with :meth:`constantdict.derive`.
+
+    The modification methods have the same signatures and semantics as the
+    corresponding :class:`constantdict` methods, including raising
+    :exc:`KeyError` for missing keys right away, but return a new
+    :class:`constantdictderivation` instead of a new :class:`constantdict`.
+    Derivations are immutable and can be extended in several directions.
+
+    Reading from a derivation (for example via indexing, iteration,
+    comparison or hashing) computes the result with :meth:`finish`.
+
+    .. automethod:: set
+    .. automethod:: setdefault
+    .. automethod:: delete
+    .. automethod:: update
+    .. automethod:: discard
+    .. automethod:: finish
+    """
+
+    __slots__ = ("_op", "_parent", "_result")
+
+    def __init__(self, base: constantdict[K, V]) -> None:
+        # Either _result is set, or _op describes how to compute it from
+        # _parent: as a tuple (items, delete), where the keys of the dict
+        # items are deleted if delete is True, and set to its values otherwise.
+        self._result: constantdict[K, V] | None = base
+        self._parent: constantdictderivation[K, V] | None = None
+        self._op: tuple[dict[Any, Any], bool] | None = None
+
+    def _derive(self, items: dict[Any, Any],
+                delete: bool = False) -> constantdictderivation[K, V]:
+        result = constantdictderivation.__new__(constantdictderivation)
+        result._result = None
+        result._parent = self
+        result._op = (items, delete)
+        return result
+
+    def _contains(self, key: Any) -> bool:
+        """Return whether *key* is in the result, without computing it."""
+        node = self
+        while node._result is None:
+            items, delete = node._op  # type: ignore[misc]
+            if key in items:
+                return not delete
+            node = node._parent  # type: ignore[assignment]
+
+        return key in node._result
+
+    # {{{ methods that record a modification
+
+    # value: Any due to https://github.com/python/mypy/issues/7049
+    def set(self, key: K, value: Any) -> constantdictderivation[K, V]:
+        """See :meth:`constantdict.set`."""
+        return self._derive({key: value})
+
+    def setdefault(self, key: K, default: Any = None) -> constantdictderivation[K, V]:
+        """See :meth:`constantdict.setdefault`."""
+        if self._contains(key):
+            return self
+
+        return self._derive({key: default})
+
+    def delete(self, key: K) -> constantdictderivation[K, V]:
+        """See :meth:`constantdict.delete`."""
+        if not self._contains(key):
+            raise KeyError(key)
+
+        return self._derive({key: None}, delete=True)
+
+    remove = delete
+
+    def update(self, other: Mapping[K, V]
+                      | SupportsKeysAndGetItem[K, V]
+                      | type[_NotProvided] = _NotProvided,
+                      **kwargs: Any) -> constantdictderivation[K, V]:
+        """See :meth:`constantdict.update`."""
+        if other is not _NotProvided:
+            items = dict(other, **kwargs)  # type: ignore[arg-type]
+        else:
+            items = kwargs
+
+        return self._derive(items)
+
+    def discard(self, key: K) -> constantdictderivation[K, V]:
+        """See :meth:`constantdict.discard`."""
+        if not self._contains(key):
+            return self
+
+        return self._derive({key: None}, delete=True)
+
+    # }}}
+
+    def finish(self) -> constantdict[K, V]:
+        """Return the :class:`constantdict` with all recorded modifications
+        applied. The result is computed only once.
+        """
+        if self._result is not None:
+            return self._result
+
+        ops = []
+        node = self
+        while node._result is None:
+            ops.append(node._op)
+            node = node._parent  # type: ignore[assignment]
+
+        d = node._result.mutate()
+        for items, delete in reversed(ops):
+            if delete:
+                for key in items:
+                    del d[key]
+            else:
+                d.update(items)
+
+        self._result = result = d.finish()
+        # Allow the intermediate derivations to be garbage collected.
+        self._parent = None
+        self._op = None
+        return result
+
+    # {{{ read access, which computes the result
+
+    def __getitem__(self, key: K) -> V:
+        return self.finish()[key]
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self.finish())
+
+    def __len__(self) -> int:
+        return len(self.finish())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.finish()
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, constantdictderivation):
+            other = other.finish()
+        return self.finish() == other
+
+    def __hash__(self) -> int:
+        return hash(self.finish())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.finish()!r})"
+
+    # }}}
 
 
 class constantdictuncachedhash(constantdict[K, V]):
@@ -321,8 +1196,13 @@ class constantdictuncachedhash(constantdict[K, V]):
     behaves exactly like a :class:`constantdict` in all other respects.
     """
 
+    __slots__ = ()
+
     def __hash__(self) -> int:  # type: ignore[override]
         # Same "algorithm" as in constantdict
+        if _profiler is not None:
+            return _profiler.call("hash", self,
+                                  lambda: hash(frozenset(self.items())))
         return hash(frozenset(self.items()))
 
     def mutate(self) -> constantdictuncachedhashmutation[K, V]:
@@ -332,6 +1212,8 @@ class constantdictuncachedhash(constantdict[K, V]):
         Run :meth:`constantdictuncachedhashmutation.finish` to convert back to an
         immutable :class:`constantdict`.
         """
+        if _profiler is not None:
+            return _profiler.call("copy", self, constantdictuncachedhashmutation, self)
         return constantdictuncachedhashmutation(self)
 
 
@@ -341,7 +1223,643 @@ class constantdictuncachedhashmutation(constantdictmutation[K, V]):
     exactly like a :class:`constantdictmutation` in all other respects.
     """
 
+    __slots__ = ()
+
     def finish(self) -> constantdictuncachedhash[K, V]:
         """Convert this object to an immutable version of itself."""
-        self.__class__ = constantdictuncachedhash  # type: ignore[assignment]
-        return self  # type: ignore[return-value]
+        return _finish(self, constantdictuncachedhash)  # type: ignore[no-any-return]
+
+
+# {{{ selective hash caching
+
+# CPython computes the hash of a frozenset by combining the shuffled hashes of
+# its entries with XOR, followed by a finalization step. Reproducing this
+# allows computing the hash of a constantdict in parts, while still giving
+# the same result as hash(frozenset(self.items())).
+_HASH_BITS = sys.hash_info.width
+_HASH_MASK = (1 << _HASH_BITS) - 1
+
+
+def _shuffle_hash(h: int) -> int:
+    h &= _HASH_MASK
+    return (((h ^ 89869747) ^ (h << 16)) * 3644798167) & _HASH_MASK
+
+
+def _finalize_hash(h: int, n: int) -> int:
+    """Return the frozenset hash of *n* entries, given the XOR *h* of their
+    shuffled hashes."""
+    h ^= ((n + 1) * 1927868237) & _HASH_MASK
+    h ^= (h >> 11) ^ (h >> 25)
+    h = (h * 69069 + 907133923) & _HASH_MASK
+    if h == _HASH_MASK:  # pragma: no cover
+        # -1 is not a valid hash value
+        h = 590923713
+    # Convert to a signed value
+    if h >> (_HASH_BITS - 1):
+        h -= 1 << _HASH_BITS
+    return h
+
+
+# Whether the functions above reproduce hash(frozenset(...)) on this Python
+# implementation, None if not checked yet.
+_frozenset_hash_reproducible: bool | None = None
+
+
+def _check_frozenset_hash() -> bool:
+    global _frozenset_hash_reproducible
+    if _frozenset_hash_reproducible is None:
+        samples: tuple[frozenset[Any], ...] = (
+            frozenset(), frozenset({("a", 1)}),
+            frozenset({("a", 1), (2, (3.5, None)), (b"c", -1)}))
+        _frozenset_hash_reproducible = all(
+            _finalize_hash(_xor_shuffled_hashes(s), len(s)) == hash(s)
+            for s in samples)
+
+    return _frozenset_hash_reproducible
+
+
+def _xor_shuffled_hashes(items: Iterable[Any]) -> int:
+    h = 0
+    for item in items:
+        h ^= _shuffle_hash(hash(item))
+    return h
+
+
+class constantdictselectivehash(constantdict[K, V]):
+    """A :class:`constantdict` that caches the hash contribution of the items
+    whose key and value are known to be immutable, and only recomputes the
+    contribution of the remaining items in each call to :meth:`__hash__`.
+    This is useful when most, but not all, values are immutable, and the
+    hash values of the others might change. This class behaves exactly like
+    a :class:`constantdict` in all other respects.
+
+    Keys and values are known to be immutable if they are instances of
+    :class:`bool`, :class:`int`, :class:`float`, :class:`complex`,
+    :class:`str`, :class:`bytes` or :class:`range` (but not of subclasses
+    of these types), *None*, :data:`Ellipsis` or :data:`NotImplemented`,
+    tuples or frozensets of such objects, or :class:`constantdict`
+    instances whose keys and values are all known to be immutable.
+
+    The hash value is the same as that of an equal :class:`constantdict`. On
+    Python implementations where this can not be achieved by combining the
+    hashes of the items, the hash is recomputed completely in each call, as
+    in :class:`constantdictuncachedhash`.
+
+    .. automethod:: __hash__
+    """
+
+    __slots__ = ()
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        """Return a hash of this :class:`constantdictselectivehash`, only
+        recomputing the hashes of the items that are not known to be
+        immutable."""
+        if not _check_frozenset_hash():  # pragma: no cover
+            return hash(frozenset(self.items()))
+
+        try:
+            partial_hash, mutable_keys = self._partial_hash
+        except AttributeError:
+            partial_hash = 0
+            mutable = []
+            for item in self.items():
+                if _is_immutable(item):
+                    partial_hash ^= _shuffle_hash(hash(item))
+                else:
+                    mutable.append(item[0])
+            mutable_keys = tuple(mutable)
+            self._partial_hash: tuple[int, tuple[K, ...]] = \
+                (partial_hash, mutable_keys)
+
+        for k in mutable_keys:
+            partial_hash ^= _shuffle_hash(hash((k, self[k])))
+
+        return _finalize_hash(partial_hash, len(self))
+
+    def mutate(self) -> constantdictselectivehashmutation[K, V]:
+        """Return a mutable copy of this :class:`constantdict` as a
+        :class:`constantdictselectivehashmutation`.
+
+        Run :meth:`constantdictselectivehashmutation.finish` to convert back
+        to an immutable :class:`constantdict`.
+        """
+        if _profiler is not None:
+            return _profiler.call("copy", self, constantdictselectivehashmutation, self)
+        return constantdictselectivehashmutation(self)
+
+
+class constantdictselectivehashmutation(constantdictmutation[K, V]):
+    """A mutable dictionary that can be converted back to a
+    :class:`constantdictselectivehash` without copying. This class behaves
+    exactly like a :class:`constantdictmutation` in all other respects.
+    """
+
+    __slots__ = ()
+
+    def finish(self) -> constantdictselectivehash[K, V]:
+        """Convert this object to an immutable version of itself."""
+        return _finish(self, constantdictselectivehash)  # type: ignore[no-any-return]
+
+# }}}
+
+
+# {{{ key interning
+
+# Intern table for hashable keys that are not strings. Both the keys and the
+# canonical instances are only referenced weakly, so interning a key does
+# not keep it alive.
+_intern_table: Any = None
+
+
+def intern_key(key: K) -> K:
+    """Return a canonical instance of *key*.
+
+    Strings are interned with :func:`sys.intern`. Other keys are interned in
+    a table that references them weakly. Keys that can not be referenced
+    weakly (such as :class:`int` or :class:`tuple`) are returned unchanged.
+    """
+    if type(key) is str:
+        return sys.intern(key)  # type: ignore[call-overload,no-any-return]
+
+    global _intern_table
+    if _intern_table is None:
+        from weakref import WeakKeyDictionary
+        _intern_table = WeakKeyDictionary()
+
+    try:
+        ref = _intern_table.get(key)
+    except TypeError:
+        # cannot create weak reference to 'key'
+        return key
+
+    if ref is not None:
+        canonical = ref()
+        if canonical is not None:
+            return canonical  # type: ignore[no-any-return]
+
+    from weakref import ref as weakref
+
+    _intern_table[key] = weakref(key)
+    return key
+
+
+def _interned_items(*args: Any, **kwargs: Any) -> Iterable[tuple[Any, Any]]:
+    """Return the items of ``dict(*args, **kwargs)`` with interned keys."""
+    if len(args) == 1 and not kwargs and isinstance(args[0], constantdictinterned):
+        # Keys are already interned
+        return args[0].items()
+
+    d = dict(*args, **kwargs)
+    return zip(map(intern_key, d), d.values())
+
+
+class constantdictinterned(constantdict[K, V]):
+    """A :class:`constantdict` that interns its keys with :func:`intern_key`,
+    on construction as well as in :meth:`~constantdict.fromkeys`,
+    :meth:`~constantdict.set`, :meth:`~constantdict.update`, and all other
+    methods that add keys.
+
+    Interning makes equal keys of different instances share a single
+    object, which saves memory when many instances are built from parsed
+    input. It also speeds up lookups with interned keys (such as string
+    literals), since these first compare keys by identity. This class
+    behaves exactly like a :class:`constantdict` in all other respects.
+
+    .. doctest::
+
+        >>> import sys
+        >>> key = "".join(["na", "me"])
+        >>> cd = constantdictinterned({key: 1})
+        >>> next(iter(cd)) is sys.intern("name")
+        True
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        dict.__init__(self, _interned_items(*args, **kwargs))
+
+    @staticmethod
+    def fromkeys(iterable: Iterable[K],  # type: ignore[override]
+                 value: V | None = None) -> constantdictinterned[K, V | Any]:
+        """Create a new :class:`constantdictinterned` from supplied keys and
+        values."""
+        d = constantdictinternedmutation.fromkeys(iterable, value)
+        d.__class__ = constantdictinterned
+        return d  # type: ignore[return-value]
+
+    def mutate(self) -> constantdictinternedmutation[K, V]:
+        """Return a mutable copy of this :class:`constantdict` as a
+        :class:`constantdictinternedmutation`.
+
+        Run :meth:`constantdictinternedmutation.finish` to convert back to an
+        immutable :class:`constantdictinterned`.
+        """
+        if _profiler is not None:
+            return _profiler.call("copy", self, constantdictinternedmutation, self)
+        return constantdictinternedmutation(self)
+
+
+class constantdictinternedmutation(constantdictmutation[K, V]):
+    """A mutable dictionary that interns its keys, and that can be converted
+    back to a :class:`constantdictinterned` without copying. This class
+    behaves exactly like a :class:`constantdictmutation` in all other
+    respects.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        dict.__init__(self, _interned_items(*args, **kwargs))
+
+    def __setitem__(self, key: K, value: V) -> None:  # type: ignore[misc]
+        dict.__setitem__(self, intern_key(key), value)
+
+    def setdefault(self, key: K, default: Any = None) -> Any:
+        return dict.setdefault(self, intern_key(key), default)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        dict.update(self, _interned_items(*args, **kwargs))
+
+    def __ior__(self, other: Any) -> constantdictinternedmutation[K, V]:  # type: ignore[override,misc]
+        self.update(other)
+        return self
+
+    def finish(self) -> constantdictinterned[K, V]:
+        """Convert this object to an immutable version of itself."""
+        return _finish(self, constantdictinterned)  # type: ignore[no-any-return]
+
+# }}}
+
+
+# {{{ lazy values
+
+class lazyvalue:
+    """A value of a :class:`lazyconstantdict` that is computed by calling
+    *func* (without arguments) when it is first accessed.
+
+    *func* is called at most once, even if the value is accessed from
+    multiple threads concurrently. If *func* raises an exception, it is
+    called again on the next access.
+    """
+
+    __slots__ = ("_func", "_lock", "_value")
+
+    def __init__(self, func: Callable[[], Any]) -> None:
+        from threading import Lock
+
+        self._func: Callable[[], Any] | None = func
+        self._lock = Lock()
+        self._value: Any = None
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._func!r})"
+
+    def get(self) -> Any:
+        """Return the value, computing it if necessary."""
+        if self._func is None:
+            return self._value
+
+        with self._lock:
+            func = self._func
+            if func is not None:
+                self._value = func()
+                self._func = None
+
+        return self._value
+
+
+class lazyconstantdict(constantdict[K, V]):
+    """A :class:`constantdict` whose values can be :class:`lazyvalue`
+    instances, which are computed on first access and then replace the
+    :class:`lazyvalue` in the dictionary.
+
+    Operations that do not need the values, such as :func:`len`, ``in``,
+    :meth:`~dict.keys` and iterating over the keys, never compute values.
+    Comparisons only compute values until the result is known, whereas
+    hashing and :meth:`~dict.values`/:meth:`~dict.items` compute all values.
+    Methods that return modified copies, such as :meth:`~constantdict.set`
+    and :meth:`~constantdict.mutate`, keep both computed values and
+    :class:`lazyvalue` instances (which are shared with the copy, so that
+    they are still computed at most once).
+
+    .. doctest::
+
+        >>> cd = lazyconstantdict(a=lazyvalue(lambda: print("computing") or 42))
+        >>> len(cd), "a" in cd, list(cd)
+        (1, True, ['a'])
+        >>> cd["a"]
+        computing
+        42
+        >>> cd["a"]
+        42
+
+    .. note::
+
+        C code that accesses the dictionary directly (e.g., via
+        ``PyDict_GetItem``) sees the :class:`lazyvalue` instances.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def fromkeys(iterable: Iterable[K],  # type: ignore[override]
+                 value: V | None = None) -> lazyconstantdict[K, V | Any]:
+        """Create a new :class:`lazyconstantdict` from supplied keys and
+        values."""
+        d = lazyconstantdictmutation.fromkeys(iterable, value)
+        d.__class__ = lazyconstantdict
+        return d  # type: ignore[return-value]
+
+    def __getitem__(self, key: K) -> V:
+        value: Any = dict.__getitem__(self, key)
+        if type(value) is lazyvalue:
+            value = value.get()
+            # Replace the lazyvalue in place; this does not change the keys.
+            dict.__setitem__(self, key, value)
+        return value  # type: ignore[no-any-return]
+
+    def get(self, key: K, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def __iter__(self) -> Iterator[K]:
+        # Overriding __iter__ makes dict(self) and {**self} use __getitem__
+        # instead of copying the values (which may be lazyvalues) directly.
+        return dict.__iter__(self)
+
+    def _compute_all(self) -> None:
+        for key, value in dict.items(self):
+            if type(value) is lazyvalue:
+                self[key]
+
+    def values(self) -> ValuesView[V]:  # type: ignore[override]
+        self._compute_all()
+        return dict.values(self)
+
+    def items(self) -> ItemsView[K, V]:  # type: ignore[override]
+        self._compute_all()
+        return dict.items(self)
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+
+        missing = _NotProvided
+        for key in self:
+            other_value = other.get(key, missing)
+            if other_value is missing:
+                return False
+            value = self[key]
+            if value is not other_value and value != other_value:
+                return False
+
+        return True
+
+    def __ne__(self, other: object) -> bool:
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result  # type: ignore[no-any-return]
+        return not result
+
+    __hash__ = constantdict.__hash__
+
+    def mutate(self) -> lazyconstantdictmutation[K, V]:
+        """Return a mutable copy of this :class:`lazyconstantdict` as a
+        :class:`lazyconstantdictmutation`, without computing any values.
+
+        Run :meth:`lazyconstantdictmutation.finish` to convert back to an
+        immutable :class:`lazyconstantdict`.
+        """
+        if _profiler is not None:
+            return _profiler.call("copy", self, lazyconstantdictmutation,
+                                  dict.items(self))
+        return lazyconstantdictmutation(dict.items(self))
+
+
+class lazyconstantdictmutation(constantdictmutation[K, V]):
+    """A mutable dictionary that can be converted back to a
+    :class:`lazyconstantdict` without copying. Values are computed on
+    access like in :class:`lazyconstantdict`, which includes
+    :meth:`~dict.get`, :meth:`~dict.values`, :meth:`~dict.items`,
+    :meth:`~dict.pop`, :meth:`~dict.popitem` and :meth:`~dict.setdefault`.
+    This class behaves exactly like a :class:`constantdictmutation` in all
+    other respects.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key: K) -> V:
+        value: Any = dict.__getitem__(self, key)
+        if type(value) is lazyvalue:
+            value = value.get()
+            self[key] = value
+        return value  # type: ignore[no-any-return]
+
+    def get(self, key: K, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        return default
+
+    def __iter__(self) -> Iterator[K]:
+        # See lazyconstantdict.__iter__
+        return dict.__iter__(self)
+
+    def values(self) -> ValuesView[V]:  # type: ignore[override]
+        lazyconstantdict._compute_all(self)  # type: ignore[arg-type]
+        return dict.values(self)
+
+    def items(self) -> ItemsView[K, V]:  # type: ignore[override]
+        lazyconstantdict._compute_all(self)  # type: ignore[arg-type]
+        return dict.items(self)
+
+    __eq__ = lazyconstantdict.__eq__
+    __ne__ = lazyconstantdict.__ne__
+
+    def pop(self, key: K, *args: Any) -> Any:
+        value: Any = dict.pop(self, key, *args)
+        if type(value) is lazyvalue:
+            value = value.get()
+        return value
+
+    def popitem(self) -> tuple[K, V]:
+        key, value = dict.popitem(self)
+        if type(value) is lazyvalue:
+            value = value.get()  # type: ignore[attr-defined]
+        return key, value
+
+    def setdefault(self, key: K, default: Any = None) -> Any:
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def finish(self) -> lazyconstantdict[K, V]:
+        """Convert this object to an immutable version of itself."""
+        return _finish(self, lazyconstantdict)  # type: ignore[no-any-return]
+
+# }}}
+
+
+# {{{ transition cache
+
+class TransitionCacheInfo(NamedTuple):
+    """Statistics of the transition cache, see :func:`transition_cache_info`."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+# Types whose equal instances are interchangeable as keys and values, so that
+# arguments of these types can be part of the key of the transition cache.
+_CACHEABLE_ARGUMENT_TYPES = frozenset({str, bytes, int, bool, type(None)})
+
+
+class _TransitionCache:
+    """A bounded LRU cache of derived :class:`constantdict` instances, keyed on
+    the identity of the base, the operation and its arguments.
+
+    The bases, the results and the :class:`constantdict` operands of ``|``
+    are only referenced weakly, so caching a transition does not keep them
+    alive.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        from threading import Lock
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+        # Maps (id(base), operation, arguments) to weak references to the
+        # objects identified by id() in the key, and to the result.
+        self._entries: dict[tuple[Any, ...], tuple[tuple[Any, ...], Any]] = {}
+
+    def derive(self, base: constantdict[Any, Any], op: str,
+               *args: Any) -> constantdict[Any, Any]:
+        """Return the result of applying *op* to *base*, reusing a previously
+        derived instance if possible."""
+        if op == "or":
+            # The other operand is a constantdict, which may be large and is
+            # identified by its identity.
+            objs: tuple[Any, ...] = (base, args[0])
+            cache_key: tuple[Any, ...] = (id(base), op, id(args[0]))
+        elif all(type(arg) in _CACHEABLE_ARGUMENT_TYPES for arg in args):
+            # Include the types, as e.g. 1 == True.
+            objs = (base,)
+            cache_key = (id(base), op, *((type(arg), arg) for arg in args))
+        else:
+            return self._compute(base, op, *args)
+
+        with self._lock:
+            entry = self._entries.pop(cache_key, None)
+            if entry is not None:
+                refs, result_ref = entry
+                result = result_ref()
+                # Check the identities, as ids can be reused after the
+                # original objects were collected.
+                if result is not None and all(
+                        ref() is obj for ref, obj in zip(refs, objs)):
+                    # Reinsert as the most recently used entry.
+                    self._entries[cache_key] = entry
+                    self.hits += 1
+                    return result  # type: ignore[no-any-return]
+
+        result = self._compute(base, op, *args)
+
+        from weakref import ref
+
+        try:
+            entry = (tuple(ref(obj) for obj in objs), ref(result))
+        except TypeError:  # pragma: no cover
+            # subclass that does not support weak references
+            return result
+
+        with self._lock:
+            self.misses += 1
+            self._entries[cache_key] = entry
+            if len(self._entries) > self.maxsize:
+                del self._entries[next(iter(self._entries))]
+
+        return result
+
+    @staticmethod
+    def _compute(base: constantdict[Any, Any], op: str,
+                 *args: Any) -> constantdict[Any, Any]:
+        d = base.mutate()
+        if op == "set":
+            d[args[0]] = args[1]
+        elif op == "delete":
+            del d[args[0]]
+        else:
+            d.update(args[0])
+        return d.finish()
+
+    def info(self) -> TransitionCacheInfo:
+        return TransitionCacheInfo(self.hits, self.misses, self.maxsize,
+                                   len(self._entries))
+
+
+_transition_cache: _TransitionCache | None = None
+
+
+def enable_transition_cache(maxsize: int = 4096) -> None:
+    """Enable the transition cache, which makes repeated identical
+    derivations from the same :class:`constantdict` return the same instance.
+
+    When enabled, :meth:`constantdict.set`, :meth:`constantdict.delete` and
+    ``|`` with a :class:`constantdict` operand look up the identity of the
+    base dictionary, the operation and its arguments in a cache of at most
+    *maxsize* recently derived results. On a hit, the previously derived
+    instance (including its cached hash) is returned instead of a new copy.
+    Keys and values of exact type :class:`str`, :class:`bytes`,
+    :class:`int`, :class:`bool` or ``None`` are compared by type and
+    equality, since equal instances of these types are interchangeable.
+    Derivations with other arguments (e.g. floats, where ``0.0 == -0.0``,
+    or tuples, where ``(True,) == (1,)``) are not cached.
+
+    The bases and results are only referenced weakly, so the cache does not
+    keep them alive. Calling this function again clears the cache and its
+    statistics.
+
+    .. doctest::
+
+        >>> from constantdict import (constantdict, enable_transition_cache,
+        ...     disable_transition_cache, transition_cache_info)
+        >>> enable_transition_cache()
+        >>> cd = constantdict(a=1)
+        >>> cd.set("b", 2) is cd.set("b", 2)
+        True
+        >>> transition_cache_info()
+        TransitionCacheInfo(hits=1, misses=1, maxsize=4096, currsize=1)
+        >>> disable_transition_cache()
+    """
+    if maxsize < 1:
+        raise ValueError(f"maxsize must be positive, not {maxsize}")
+
+    global _transition_cache
+    _transition_cache = _TransitionCache(maxsize)
+
+
+def disable_transition_cache() -> None:
+    """Disable and clear the transition cache, see
+    :func:`enable_transition_cache`."""
+    global _transition_cache
+    _transition_cache = None
+
+
+def transition_cache_info() -> TransitionCacheInfo | None:
+    """Return the statistics of the transition cache, or *None* if it is not
+    enabled, see :func:`enable_transition_cache`."""
+    if _transition_cache is None:
+        return None
+    return _transition_cache.info()
+
+# }}}
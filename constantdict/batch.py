@@ -0,0 +1,142 @@
+"""Parallel hashing and deduplication of large collections of
+:class:`~constantdict.constantdict` records."""
+
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from typing import Any, Hashable, TypeVar
+
+from constantdict import constantdict
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+def _hash_chunk(chunk: list[constantdict[Any, Any]]) -> list[int]:
+    """Return the hashes of the records in *chunk*, which are also cached in
+    the records."""
+    return [hash(record) for record in chunk]
+
+
+def _chunks(records: Iterable[constantdict[K, V]],
+            chunksize: int) -> Iterator[list[constantdict[K, V]]]:
+    it = iter(records)
+    while True:
+        chunk = list(islice(it, chunksize))
+        if not chunk:
+            return
+        for record in chunk:
+            if not isinstance(record, constantdict):
+                raise TypeError("can only hash constantdict records, "
+                                f"not '{type(record).__name__}'")
+        yield chunk
+
+
+def hash_many(records: Iterable[constantdict[K, V]], *,
+              workers: int | None = None,
+              chunksize: int = 1024,
+              ) -> Iterator[tuple[constantdict[K, V], int]]:
+    """Yield a tuple ``(record, hash(record))`` for each record in *records*,
+    in order. The hashes are cached in the records.
+
+    The hashes are computed by a pool of *workers* threads. By default,
+    *workers* is :func:`os.cpu_count` on free-threaded Python builds, and 1
+    (i.e., everything is computed in the calling thread) otherwise, since
+    threads do not compute in parallel with the GIL. Worker processes are not
+    supported, as sending the records to them costs more than hashing them.
+
+    The records are read and processed in chunks of *chunksize* records, and
+    at most two chunks per worker are in flight at any time, so neither the
+    input nor the output needs to fit in memory.
+    """
+    if workers is None:
+        gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+        workers = 1 if gil_enabled else os.cpu_count() or 1
+
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be positive, not {chunksize}")
+
+    if workers <= 1:
+        return _hash_many_serial(records, chunksize)
+
+    return _hash_many_parallel(records, workers, chunksize)
+
+
+def _hash_many_serial(records: Iterable[constantdict[K, V]], chunksize: int,
+                      ) -> Iterator[tuple[constantdict[K, V], int]]:
+    for chunk in _chunks(records, chunksize):
+        yield from zip(chunk, _hash_chunk(chunk))
+
+
+def _hash_many_parallel(records: Iterable[constantdict[K, V]], workers: int,
+                        chunksize: int,
+                        ) -> Iterator[tuple[constantdict[K, V], int]]:
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(workers) as executor:
+        pending: deque[tuple[list[constantdict[K, V]], Any]] = deque()
+        for chunk in _chunks(records, chunksize):
+            pending.append((chunk, executor.submit(_hash_chunk, chunk)))
+            if len(pending) >= 2 * workers:
+                chunk, future = pending.popleft()
+                yield from zip(chunk, future.result())
+
+        while pending:
+            chunk, future = pending.popleft()
+            yield from zip(chunk, future.result())
+
+
+def dedupe(records: Iterable[constantdict[K, V]], *,
+           workers: int | None = None,
+           chunksize: int = 1024) -> Iterator[constantdict[K, V]]:
+    """Yield the unique records in *records*, in order of their first
+    occurrence. As with a :class:`set`, records are compared by their hash
+    and equality, so e.g. ``constantdict(a=1)`` and ``constantdict(a=1.0)``
+    are duplicates. The hashes are computed as described in
+    :func:`hash_many`, and are cached in the yielded records.
+
+    The records are streamed from input to output, and only the unique
+    records are kept in memory.
+
+    .. doctest::
+
+        >>> from constantdict import constantdict
+        >>> from constantdict.batch import dedupe
+        >>> list(dedupe([constantdict(a=1), constantdict(b=2),
+        ...              constantdict(a=1.0)]))
+        [constantdict({'a': 1}), constantdict({'b': 2})]
+    """
+    seen: set[constantdict[K, V]] = set()
+    for record, _ in hash_many(records, workers=workers, chunksize=chunksize):
+        if record not in seen:
+            seen.add(record)
+            yield record
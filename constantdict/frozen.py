@@ -0,0 +1,219 @@
+"""Helpers for keeping large, long-lived constantdict datasets out of the way of
+the cyclic garbage collector."""
+
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import sys
+from collections.abc import Generator, Mapping
+from contextlib import contextmanager
+from typing import Any
+
+from constantdict import (
+    _IMMUTABLE_TYPES,
+    constantdict,
+    constantdictinterned,
+    constantdictuncachedhash,
+)
+
+# Types that freeze() may untrack. Other subclasses of constantdict are
+# excluded, as they might add mutable state.
+_UNTRACKABLE_TYPES = frozenset({
+    tuple, frozenset, constantdict, constantdictinterned,
+    constantdictuncachedhash})
+
+# PyObject_GC_UnTrack, None if not looked up yet, False if unavailable.
+_gc_untrack: Any = None
+
+
+def _untrack(obj: Any) -> None:
+    global _gc_untrack
+    if _gc_untrack is None:
+        if sys.implementation.name == "cpython":
+            import ctypes
+
+            _gc_untrack = ctypes.pythonapi.PyObject_GC_UnTrack
+            _gc_untrack.argtypes = [ctypes.py_object]
+            _gc_untrack.restype = None
+        else:  # pragma: no cover
+            _gc_untrack = False
+
+    if _gc_untrack:
+        _gc_untrack(obj)
+
+
+class _Freezer:
+    def __init__(self, untrack: bool) -> None:
+        self.untrack = untrack
+        # id -> (frozen object, whether it is deeply immutable). The original
+        # objects are kept alive by the tree being frozen, so the ids remain
+        # unique.
+        self.memo: dict[int, tuple[Any, bool]] = {}
+        self.in_progress: set[int] = set()
+
+    def freeze(self, obj: Any) -> tuple[Any, bool]:
+        tp = type(obj)
+        if tp in _IMMUTABLE_TYPES:
+            return obj, True
+
+        try:
+            return self.memo[id(obj)]
+        except KeyError:
+            pass
+
+        if isinstance(obj, (Mapping, list, tuple, set, frozenset)):
+            if id(obj) in self.in_progress:
+                raise ValueError(
+                    f"cannot freeze self-referencing '{tp.__name__}'")
+            self.in_progress.add(id(obj))
+            result, immutable = self.freeze_container(obj)
+            self.in_progress.discard(id(obj))
+
+            # Containers whose contents are all deeply immutable can not be
+            # part of a reference cycle, so the cyclic GC does not need to
+            # track them.
+            if immutable and self.untrack:
+                if type(result) in _UNTRACKABLE_TYPES:
+                    _untrack(result)
+                else:
+                    immutable = False
+        elif tp is bytearray:
+            result, immutable = bytes(obj), True
+        else:
+            # Unknown objects are kept as they are.
+            result, immutable = obj, False
+
+        self.memo[id(obj)] = result, immutable
+        return result, immutable
+
+    def freeze_container(self, obj: Any) -> tuple[Any, bool]:
+        immutable = True
+        changed = False
+
+        if isinstance(obj, Mapping):
+            items = []
+            for k, v in obj.items():
+                new_k, k_immutable = self.freeze(k)
+                new_v, v_immutable = self.freeze(v)
+                immutable = immutable and k_immutable and v_immutable
+                changed = changed or new_k is not k or new_v is not v
+                items.append((new_k, new_v))
+
+            if isinstance(obj, constantdict):
+                if not changed:
+                    return obj, immutable
+                return obj.__class__(items), immutable
+            return constantdict(items), immutable
+
+        frozen = []
+        for item in obj:
+            new_item, item_immutable = self.freeze(item)
+            immutable = immutable and item_immutable
+            changed = changed or new_item is not item
+            frozen.append(new_item)
+
+        if isinstance(obj, (set, frozenset)):
+            tp: type = frozenset
+        else:
+            tp = tuple
+
+        if type(obj) is tp and not changed:
+            return obj, immutable
+        return tp(frozen), immutable
+
+
+def freeze(obj: Any, *, untrack: bool = True) -> Any:
+    """Return a deeply immutable version of *obj*.
+
+    Mappings are converted to :class:`~constantdict.constantdict`, lists and
+    tuples to :class:`tuple`, sets to :class:`frozenset`, and
+    :class:`bytearray` to :class:`bytes`, recursively. Objects of other
+    types are kept unchanged. Parts of *obj* that are already immutable are
+    returned as they are, and objects that are referenced multiple times are
+    only converted once, so that the result shares them as well.
+
+    If *untrack* is *True* (and on CPython), the resulting containers whose
+    contents are all deeply immutable are removed from the cyclic garbage
+    collector, so that collections do not need to traverse them. This is
+    safe, since such containers can not be part of a reference cycle.
+
+    Raise a :exc:`ValueError` if *obj* contains a reference cycle.
+
+    .. doctest::
+
+        >>> from constantdict.frozen import freeze
+        >>> freeze({"a": [1, 2], "b": {"c": {3}}})
+        constantdict({'a': (1, 2), 'b': constantdict({'c': frozenset({3})})})
+    """
+    return _Freezer(untrack).freeze(obj)[0]
+
+
+def freeze_gc() -> int:
+    """Run a full garbage collection and move all surviving objects to the
+    permanent generation of the garbage collector with :func:`gc.freeze`, so
+    that they are ignored by future collections. Return the number of
+    objects in the permanent generation.
+
+    Calling this after loading a large, long-lived dataset avoids the cost
+    of scanning it in each full collection. Before a :func:`os.fork`, this
+    also avoids the copy-on-write page faults caused by the collector
+    writing to the objects of the parent process.
+    """
+    import gc
+
+    gc.collect()
+    gc.freeze()
+    return gc.get_freeze_count()
+
+
+@contextmanager
+def gc_paused(freeze_after: bool = False) -> Generator[None, None, None]:
+    """Return a context manager that disables the cyclic garbage collector
+    while building a large dataset, which otherwise triggers many
+    collections that traverse the partially built dataset.
+
+    The previous state of the collector is restored on exit. If
+    *freeze_after* is *True*, :func:`freeze_gc` is called on (successful)
+    exit.
+
+    .. doctest::
+
+        >>> from constantdict.frozen import freeze, gc_paused
+        >>> with gc_paused():
+        ...     data = [freeze({"id": i}) for i in range(1000)]
+    """
+    import gc
+
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+        if freeze_after:
+            freeze_gc()
+    finally:
+        if was_enabled:
+            gc.enable()
@@ -0,0 +1,169 @@
+"""Inverted index over collections of :class:`~constantdict.constantdict`."""
+
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any, Generic, Hashable, TypeVar
+
+from constantdict import constantdict
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class ConstantDictIndex(Generic[K, V]):
+    """An inverted index over a collection of :class:`~constantdict.constantdict`
+    records that answers queries for records containing given ``(key, value)``
+    pairs without scanning all records.
+
+    For each ``(key, value)`` pair that occurs in any record, the index keeps
+    a posting list of the records containing that pair. Since records are
+    immutable, the index can never become stale. Equal records are stored
+    only once, using their cached hash.
+
+    .. doctest::
+
+        >>> from constantdict import constantdict
+        >>> from constantdict.index import ConstantDictIndex
+        >>> idx = ConstantDictIndex([
+        ...     constantdict(region="eu", tier=3),
+        ...     constantdict(region="eu", tier=1),
+        ...     constantdict(region="us", tier=3)])
+        >>> idx.query(region="eu", tier=3)
+        {constantdict({'region': 'eu', 'tier': 3})}
+
+    .. automethod:: add
+    .. automethod:: discard
+    .. automethod:: query
+    .. automethod:: submappings
+    """
+
+    def __init__(self, records: Iterable[constantdict[K, V]] = ()) -> None:
+        # Maps each record to its canonical (first inserted) instance.
+        self._records: dict[constantdict[K, V], constantdict[K, V]] = {}
+        self._postings: dict[tuple[K, V], set[constantdict[K, V]]] = {}
+
+        for record in records:
+            self.add(record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[constantdict[K, V]]:
+        return iter(self._records)
+
+    def __contains__(self, record: object) -> bool:
+        try:
+            return record in self._records
+        except TypeError:
+            # unhashable
+            return False
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self._records)!r})"
+
+    def add(self, record: constantdict[K, V]) -> constantdict[K, V]:
+        """Add *record* to the index.
+
+        Return the instance stored in the index, which is an existing
+        record if an equal record was added before, and *record* otherwise.
+        """
+        if not isinstance(record, constantdict):
+            raise TypeError(f"{self.__class__.__name__} can only index "
+                            f"constantdict, not '{type(record).__name__}'")
+
+        existing = self._records.get(record)
+        if existing is not None:
+            return existing
+
+        self._records[record] = record
+        for item in record.items():
+            try:
+                self._postings[item].add(record)
+            except KeyError:
+                self._postings[item] = {record}
+
+        return record
+
+    def discard(self, record: constantdict[K, V]) -> None:
+        """Remove *record* (or a record equal to it) from the index, if
+        present."""
+        existing = self._records.pop(record, None)
+        if existing is None:
+            return
+
+        for item in existing.items():
+            posting = self._postings[item]
+            posting.discard(existing)
+            if not posting:
+                del self._postings[item]
+
+    def query(self, conditions: Mapping[K, V] | None = None,
+              **kwargs: Any) -> set[constantdict[K, V]]:
+        """Return the set of records that contain all items in *conditions*
+        and *kwargs*, i.e., the records for which ``record[key] == value``
+        for all of these items.
+
+        The result is computed by intersecting the posting lists of the
+        items, starting with the shortest one.
+        """
+        items: dict[Any, Any] = dict(conditions or {}, **kwargs)
+
+        if not items:
+            return set(self._records)
+
+        postings = []
+        for item in items.items():
+            try:
+                postings.append(self._postings[item])
+            except KeyError:
+                return set()
+
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def submappings(self, mapping: Mapping[K, V]) -> set[constantdict[K, V]]:
+        """Return the set of records all of whose items are contained in
+        *mapping*.
+
+        Only the posting lists of the items in *mapping* are visited.
+        """
+        counts: dict[constantdict[K, V], int] = {}
+        for item in mapping.items():
+            for record in self._postings.get(item, ()):
+                counts[record] = counts.get(record, 0) + 1
+
+        result = {record for record, count in counts.items()
+                  if count == len(record)}
+
+        # Empty records have no postings, but are submappings of anything.
+        empty = self._records.get(constantdict())
+        if empty is not None:
+            result.add(empty)
+
+        return result
@@ -0,0 +1,129 @@
+"""Decoding JSON documents directly into :class:`~constantdict.constantdict`."""
+
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import json
+import sys
+from typing import IO, Any, Callable
+
+from constantdict import constantdict
+
+
+def _to_tuple(lst: list[Any]) -> tuple[Any, ...]:
+    """Convert a decoded JSON array (and all arrays nested directly in it)
+    to tuples. Objects in the array have already been converted by the
+    object hook."""
+    return tuple(_to_tuple(item) if type(item) is list else item for item in lst)
+
+
+def _make_object_hook(intern_keys: bool,
+                      arrays_as_tuples: bool) -> Callable[[dict[str, Any]], Any]:
+    # Note that building the constantdict from the temporary dict created by
+    # the decoder is faster than building it from a list of pairs via
+    # object_pairs_hook, as copying a dict clones its hash table directly.
+
+    if not intern_keys and not arrays_as_tuples:
+        return constantdict
+
+    intern = sys.intern
+
+    def object_hook(d: dict[str, Any]) -> constantdict[str, Any]:
+        if arrays_as_tuples:
+            for v in d.values():
+                if type(v) is list:
+                    # Only objects that contain arrays take this slow path.
+                    for k, v in d.items():
+                        if type(v) is list:
+                            d[k] = _to_tuple(v)
+                    break
+
+        if intern_keys:
+            return constantdict(zip(map(intern, d), d.values()))
+        return constantdict(d)
+
+    return object_hook
+
+
+def loads_json(data: str | bytes | bytearray, *, intern_keys: bool = False,
+               arrays_as_tuples: bool = True, **kwargs: Any) -> Any:
+    """Deserialize the JSON document *data*, converting JSON objects to
+    :class:`~constantdict.constantdict` and, if *arrays_as_tuples* is *True*,
+    JSON arrays to :class:`tuple`, so that the result is hashable.
+
+    Identical keys within one document already share a single string object,
+    since :mod:`json` memoizes them while decoding. If *intern_keys* is *True*,
+    keys are additionally interned with :func:`sys.intern`, so that they are
+    also shared across documents.
+
+    Additional keyword arguments are passed to :func:`json.loads`.
+
+    .. doctest::
+
+        >>> from constantdict.json import loads_json
+        >>> loads_json('{"a": [1, {"b": null}], "c": "d"}')
+        constantdict({'a': (1, constantdict({'b': None})), 'c': 'd'})
+    """
+    result = json.loads(data,
+                        object_hook=_make_object_hook(intern_keys,
+                                                      arrays_as_tuples),
+                        **kwargs)
+    if arrays_as_tuples and type(result) is list:
+        return _to_tuple(result)
+    return result
+
+
+def load_json(fp: IO[str] | IO[bytes], *, intern_keys: bool = False,
+              arrays_as_tuples: bool = True, **kwargs: Any) -> Any:
+    """Like :func:`loads_json`, but read the JSON document from the file-like
+    object *fp*."""
+    return loads_json(fp.read(), intern_keys=intern_keys,
+                      arrays_as_tuples=arrays_as_tuples, **kwargs)
+
+
+def dumps_json(obj: Any, **kwargs: Any) -> str:
+    """Serialize *obj*, which may contain :class:`~constantdict.constantdict`
+    instances and tuples, to a JSON document. This is the inverse of
+    :func:`loads_json`.
+
+    Keyword arguments are passed to :func:`json.dumps`.
+
+    .. doctest::
+
+        >>> from constantdict import constantdict
+        >>> from constantdict.json import dumps_json
+        >>> dumps_json(constantdict(a=(1, constantdict(b=None))))
+        '{"a": [1, {"b": null}]}'
+    """
+    return json.dumps(obj, **kwargs)
+
+
+def dump_json(obj: Any, fp: IO[str], **kwargs: Any) -> None:
+    """Like :func:`dumps_json`, but write the JSON document to the file-like
+    object *fp*."""
+    json.dump(obj, fp, **kwargs)
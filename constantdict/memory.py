@@ -0,0 +1,245 @@
+"""Deep memory accounting for trees of :class:`~constantdict.constantdict`."""
+
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+from constantdict import constantdict
+
+
+@dataclass(frozen=True)
+class MemoryReport:
+    """Result of :func:`memory_report`. All sizes are in bytes.
+
+    .. attribute:: total
+
+        Total deep size, i.e., the sum of :attr:`containers`, :attr:`keys`,
+        :attr:`values` and :attr:`cache`.
+
+    .. attribute:: containers
+
+        Size of the :class:`~constantdict.constantdict` objects themselves,
+        including their hash tables.
+
+    .. attribute:: keys
+
+        Deep size of the keys.
+
+    .. attribute:: values
+
+        Deep size of the values, excluding nested
+        :class:`~constantdict.constantdict` instances (which are accounted
+        for in the other categories).
+
+    .. attribute:: cache
+
+        Size of the per-instance caches, such as the cached hash value.
+
+    .. attribute:: num_constantdicts
+
+        Number of distinct :class:`~constantdict.constantdict` instances.
+
+    .. attribute:: interning_savings
+
+        Bytes that would be saved if equal keys were the same object, e.g.,
+        by using :class:`~constantdict.constantdictinterned`.
+
+    .. attribute:: sharing_savings
+
+        Bytes that would be saved if equal (hashable)
+        :class:`~constantdict.constantdict` subtrees were the same object.
+    """
+
+    total: int
+    containers: int
+    keys: int
+    values: int
+    cache: int
+    num_constantdicts: int
+    interning_savings: int
+    sharing_savings: int
+
+    def __str__(self) -> str:
+        return "\n".join([
+            f"total:             {self.total:>12} bytes",
+            f"  containers:      {self.containers:>12} bytes",
+            f"  keys:            {self.keys:>12} bytes",
+            f"  values:          {self.values:>12} bytes",
+            f"  cache:           {self.cache:>12} bytes",
+            f"constantdicts:     {self.num_constantdicts:>12}",
+            f"interning savings: {self.interning_savings:>12} bytes",
+            f"sharing savings:   {self.sharing_savings:>12} bytes",
+        ])
+
+
+# Names of the attributes in which constantdict caches values.
+_CACHE_ATTRIBUTES = ("_hash", "_immutable", "_digest", "_partial_hash")
+
+
+class _CanonicalId:
+    """Marker for the id of a canonical constantdict in sharing keys."""
+
+
+class _MemoryWalker:
+    def __init__(self) -> None:
+        # ids of objects that have already been counted. The objects are
+        # kept alive by the tree being walked, so the ids remain unique.
+        self.seen: set[int] = set()
+        self.sizes = {"containers": 0, "keys": 0, "values": 0, "cache": 0}
+        self.num_constantdicts = 0
+
+        # first seen instances of equal keys and constantdicts
+        self.canonical_keys: dict[Any, Any] = {}
+        self.canonical_dicts: dict[frozenset[Any], constantdict[Any, Any]] = {}
+        # id of each visited constantdict -> id of its canonical instance
+        self.canonical_ids: dict[int, int] = {}
+        self.interning_savings = 0
+        self.sharing_savings = 0
+
+    def visit(self, obj: Any, category: str) -> int:
+        """Count *obj* and everything it references in *category*, and
+        return the number of bytes that were not counted before."""
+        if id(obj) in self.seen:
+            return 0
+        self.seen.add(id(obj))
+
+        if isinstance(obj, constantdict):
+            return self.visit_constantdict(obj)
+
+        size = sys.getsizeof(obj)
+        self.sizes[category] += size
+
+        if isinstance(obj, (tuple, list, set, frozenset)):
+            for item in obj:
+                size += self.visit(item, category)
+        elif isinstance(obj, dict):
+            for k, v in obj.items():
+                size += self.visit(k, category) + self.visit(v, category)
+
+        return size
+
+    def visit_constantdict(self, cd: constantdict[Any, Any]) -> int:
+        self.num_constantdicts += 1
+        sharing_savings_before = self.sharing_savings
+
+        size = sys.getsizeof(cd)
+        self.sizes["containers"] += size
+
+        cached = [getattr(cd, name) for name in _CACHE_ATTRIBUTES
+                  if hasattr(cd, name)]
+        if cached:
+            # The caches are usually stored in slots, which are included in
+            # the size of cd, but subclasses without __slots__ might store
+            # them in __dict__. Only access __dict__ if there is something
+            # cached, since the access can create an (empty) __dict__ on some
+            # Python versions.
+            try:
+                inst_dict_size = sys.getsizeof(cd.__dict__)
+            except AttributeError:
+                inst_dict_size = 0
+            self.sizes["cache"] += inst_dict_size
+            size += inst_dict_size
+            for v in cached:
+                size += self.visit(v, "cache")
+
+        for k, v in cd.items():
+            key_size = self.visit(k, "keys")
+            if key_size and self.canonical_keys.setdefault(k, k) is not k:
+                self.interning_savings += key_size
+            size += key_size + self.visit(v, "values")
+
+        # Do not use hash(cd) here (or of nested constantdicts), as that would
+        # add to the cache. Nested constantdicts have been visited already, so
+        # they can be represented by the id of their canonical instance.
+        canonical_ids = self.canonical_ids
+        try:
+            items = frozenset(
+                (k, (_CanonicalId, canonical_ids[id(v)])
+                 if id(v) in canonical_ids else v)
+                for k, v in cd.items())
+        except TypeError:
+            # unhashable values
+            canonical_ids[id(cd)] = id(cd)
+        else:
+            canonical = self.canonical_dicts.setdefault(items, cd)
+            canonical_ids[id(cd)] = id(canonical)
+            if canonical is not cd:
+                # This includes the savings of all subtrees of cd.
+                self.sharing_savings = sharing_savings_before + size
+
+        return size
+
+
+def memory_report(obj: Any) -> MemoryReport:
+    """Return a :class:`MemoryReport` of the deep memory usage of *obj*,
+    which is typically a (nested) :class:`~constantdict.constantdict`.
+
+    Objects that are referenced multiple times in the tree are only
+    counted once. :class:`~constantdict.constantdict` instances contained in
+    :class:`tuple`, :class:`list`, :class:`set`, :class:`frozenset` or
+    :class:`dict` values are accounted for as well. Other objects are
+    counted with :func:`sys.getsizeof`, without following their references.
+
+    .. note::
+
+        This function is only available on CPython, since other
+        implementations such as PyPy do not support :func:`sys.getsizeof`.
+        It raises a :exc:`NotImplementedError` on those.
+
+    .. doctest::
+
+        >>> from constantdict import constantdict
+        >>> from constantdict.memory import memory_report
+        >>> inner = constantdict(x=1)
+        >>> report = memory_report(constantdict(a=inner, b=inner))
+        >>> report.num_constantdicts
+        2
+        >>> report.total == (report.containers + report.keys + report.values
+        ...                  + report.cache)
+        True
+    """
+    if sys.implementation.name != "cpython":
+        raise NotImplementedError("memory_report requires sys.getsizeof, "
+                                  "which is only available on CPython")
+
+    walker = _MemoryWalker()
+    walker.visit(obj, "values")
+
+    return MemoryReport(
+        total=sum(walker.sizes.values()),
+        containers=walker.sizes["containers"],
+        keys=walker.sizes["keys"],
+        values=walker.sizes["values"],
+        cache=walker.sizes["cache"],
+        num_constantdicts=walker.num_constantdicts,
+        interning_savings=walker.interning_savings,
+        sharing_savings=walker.sharing_savings,
+    )
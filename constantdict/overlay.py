@@ -0,0 +1,259 @@
+"""Overlays that store small changes on top of a large constantdict."""
+
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from collections.abc import Iterable, Iterator
+from typing import Any, Hashable, Mapping, TypeVar  # <3.9 needs typing.Mapping
+
+from constantdict import constantdict
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class constantdictoverlay(Mapping[K, V]):
+    """An immutable mapping that stores a reference to a base
+    :class:`~constantdict.constantdict` and a small set of changes to it.
+
+    Methods that return modified copies (:meth:`set`, :meth:`delete`,
+    :meth:`update`, ...) only copy the changes, not the base, which makes
+    them much faster than the corresponding :class:`~constantdict.constantdict`
+    methods for large bases. Reads fall through to the base for unchanged
+    keys. Once the number of changes exceeds :attr:`max_changes` (or a
+    quarter of the size of the base), the overlay is compacted, i.e., a new
+    flat base is created that includes all changes.
+
+    Equality, hashing and iteration order are exactly the same as for a
+    :class:`~constantdict.constantdict` with the same operations applied.
+    Note that a :class:`constantdictoverlay` is not a :class:`dict`, and
+    that lookups are about an order of magnitude slower than for a
+    :class:`~constantdict.constantdict`. Overlays are therefore only useful
+    for large bases (more than about 100 items, see
+    ``examples/speed_overlay.py``) that are modified much more often than read.
+
+    .. doctest::
+
+        >>> from constantdict import constantdict
+        >>> from constantdict.overlay import constantdictoverlay
+        >>> base = constantdict.fromkeys(range(1000), 0)
+        >>> o = constantdictoverlay(base).set(1, 1).delete(2).set("new", 3)
+        >>> o[1], 2 in o, o["new"], len(o)
+        (1, False, 3, 1000)
+        >>> o == base.set(1, 1).delete(2).set("new", 3)
+        True
+
+    .. attribute:: max_changes
+
+        Maximum number of changed keys before the overlay is compacted.
+
+    .. automethod:: set
+    .. automethod:: setdefault
+    .. automethod:: delete
+    .. automethod:: discard
+    .. automethod:: update
+    .. automethod:: compact
+    """
+
+    max_changes = 32
+
+    def __init__(self, base: Mapping[K, V] = constantdict()) -> None:
+        self._base: constantdict[K, V] = (
+            base if isinstance(base, constantdict) else constantdict(base))
+
+        # Base keys whose value was changed, but that keep their position.
+        self._updated: dict[K, V] = {}
+        # Base keys that do not occupy their position in the base anymore.
+        self._removed: set[K] = set()
+        # Keys that are iterated after the base keys, in insertion order:
+        # new keys, and base keys that were deleted and then added again.
+        self._appended: dict[K, V] = {}
+
+    def _derive(self) -> constantdictoverlay[K, V]:
+        """Return a copy of this overlay that shares the base."""
+        result: constantdictoverlay[K, V] = constantdictoverlay.__new__(
+            self.__class__)
+        result._base = self._base
+        result._updated = self._updated.copy()
+        result._removed = self._removed.copy()
+        result._appended = self._appended.copy()
+        return result
+
+    def _finish(self) -> constantdictoverlay[K, V]:
+        """Compact this (newly derived) overlay if it has too many changes."""
+        num_changes = len(self._updated) + len(self._removed) + len(self._appended)
+        if (num_changes > self.max_changes
+                or 4 * num_changes > len(self._base)):
+            self._base = self.compact()
+            self._updated = {}
+            self._removed = set()
+            self._appended = {}
+        return self
+
+    def compact(self) -> constantdict[K, V]:
+        """Return a flat :class:`~constantdict.constantdict` with the same
+        items as this overlay."""
+        if not (self._updated or self._removed or self._appended):
+            return self._base
+
+        d = self._base.mutate()
+        for k in self._removed:
+            del d[k]
+        d.update(self._updated)
+        d.update(self._appended)
+        return d.finish()
+
+    # {{{ Mapping interface
+
+    def __getitem__(self, key: K) -> V:
+        try:
+            return self._appended[key]
+        except KeyError:
+            pass
+        if key in self._removed:
+            raise KeyError(key)
+        try:
+            return self._updated[key]
+        except KeyError:
+            return self._base[key]
+
+    def __contains__(self, key: object) -> bool:
+        return (key in self._appended
+                or (key in self._base and key not in self._removed))
+
+    def __len__(self) -> int:
+        return len(self._base) - len(self._removed) + len(self._appended)
+
+    def __iter__(self) -> Iterator[K]:
+        removed = self._removed
+        if removed:
+            for k in self._base:
+                if k not in removed:
+                    yield k
+        else:
+            yield from self._base
+        yield from self._appended
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        if len(self) != len(other):
+            return False
+
+        missing = object()
+        for k, v in self.items():
+            other_v = other.get(k, missing)
+            if other_v is missing or (other_v is not v and other_v != v):
+                return False
+        return True
+
+    def __hash__(self) -> int:
+        """Return the same hash as a :class:`~constantdict.constantdict` with
+        the same items. Once computed, the hash is cached."""
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash: int = hash(frozenset(self.items()))
+            return self._hash
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.items())!r})"
+
+    def __reduce__(self) -> tuple[type, tuple[constantdict[K, V]]]:
+        return (self.__class__, (self.compact(),))
+
+    # }}}
+
+    # {{{ methods that return a modified copy
+
+    def set(self, key: K, value: Any) -> constantdictoverlay[K, V]:
+        """Return a new :class:`constantdictoverlay` with the item at *key*
+        set to *value*."""
+        result = self._derive()
+        result._set(key, value)
+        return result._finish()
+
+    def _set(self, key: K, value: Any) -> None:
+        if key in self._appended:
+            self._appended[key] = value
+        elif key in self._base and key not in self._removed:
+            self._updated[key] = value
+        else:
+            self._appended[key] = value
+
+    def setdefault(self, key: K, default: Any = None) -> constantdictoverlay[K, V]:
+        """Return a new :class:`constantdictoverlay` with the item at *key*
+        set to *default* if *key* is not present, and a reference to itself
+        otherwise."""
+        if key in self:
+            return self
+        return self.set(key, default)
+
+    def delete(self, key: K) -> constantdictoverlay[K, V]:
+        """Return a new :class:`constantdictoverlay` without the item at
+        *key*. Raise a :exc:`KeyError` if *key* is not present."""
+        if key not in self:
+            raise KeyError(key)
+
+        result = self._derive()
+        if key in result._appended:
+            del result._appended[key]
+        else:
+            result._removed.add(key)
+            result._updated.pop(key, None)
+        return result._finish()
+
+    remove = delete
+
+    def discard(self, key: K) -> constantdictoverlay[K, V]:
+        """Return a new :class:`constantdictoverlay` without the item at
+        *key*, or a reference to itself if *key* is not present."""
+        if key not in self:
+            return self
+        return self.delete(key)
+
+    def update(self, other: Mapping[K, V] | Iterable[tuple[K, V]] = (),
+               **kwargs: Any) -> constantdictoverlay[K, V]:
+        """Return a new :class:`constantdictoverlay` with updated items from
+        *other* and *kwargs*."""
+        result = self._derive()
+        items = other.items() if isinstance(other, Mapping) else other
+        for k, v in items:
+            result._set(k, v)
+        for k, v in kwargs.items():
+            result._set(k, v)  # type: ignore[arg-type]
+        return result._finish()
+
+    def __or__(self, other: Mapping[K, V]) -> constantdictoverlay[K, V]:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return self.update(other)
+
+    # }}}
@@ -0,0 +1,249 @@
+"""Sampling profiler that attributes expensive copies and hash computations
+of :class:`~constantdict.constantdict` instances to their call sites."""
+
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import os
+import sys
+from collections.abc import Callable, Sized
+from dataclasses import asdict, dataclass
+from threading import Lock
+from time import perf_counter
+from typing import Any, TypeVar
+
+import constantdict as _constantdict_module
+
+T = TypeVar("T")
+
+# Frames in files of this package are skipped when determining call sites.
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+
+@dataclass(frozen=True)
+class CallSiteStats:
+    """Statistics of the sampled operations at one call site, see
+    :func:`profiling_report`.
+
+    .. attribute:: operation
+
+        ``"copy"`` followed by the name of the :class:`~constantdict.constantdict`
+        method that made the copy (e.g., ``"copy (set)"``), or ``"hash"``.
+
+    .. attribute:: filename
+    .. attribute:: lineno
+    .. attribute:: function
+
+        Location of the call outside of this package.
+
+    .. attribute:: count
+
+        Number of sampled operations.
+
+    .. attribute:: total_size
+
+        Total number of entries of the copied or hashed dictionaries.
+
+    .. attribute:: max_size
+
+        Size of the largest copied or hashed dictionary.
+
+    .. attribute:: total_time
+
+        Total time spent in the operations, in seconds.
+    """
+
+    operation: str
+    filename: str
+    lineno: int
+    function: str
+    count: int
+    total_size: int
+    max_size: int
+    total_time: float
+
+
+@dataclass(frozen=True)
+class ProfilingReport:
+    """Result of :func:`profiling_report`.
+
+    .. attribute:: sites
+
+        List of :class:`CallSiteStats`, sorted by decreasing
+        :attr:`CallSiteStats.total_size`.
+
+    .. attribute:: min_size
+    .. attribute:: sample_rate
+
+        Parameters of :func:`enable_profiling`.
+
+    .. automethod:: to_json
+    """
+
+    sites: list[CallSiteStats]
+    min_size: int
+    sample_rate: float
+
+    def __str__(self) -> str:
+        lines = [(f"{'operation':<20} {'count':>8} {'entries':>12} "
+                  f"{'max':>10} {'time [s]':>10}  call site")]
+        for site in self.sites:
+            lines.append(
+                f"{site.operation:<20} {site.count:>8} {site.total_size:>12} "
+                f"{site.max_size:>10} {site.total_time:>10.4f}  "
+                f"{site.filename}:{site.lineno} ({site.function})")
+        return "\n".join(lines)
+
+    def to_json(self, **kwargs: Any) -> str:
+        """Return this report as a JSON string. *kwargs* are passed to
+        :func:`json.dumps`."""
+        import json
+
+        return json.dumps(asdict(self), **kwargs)
+
+
+class _Profiler:
+    def __init__(self, min_size: int, sample_rate: float,
+                 max_sites: int) -> None:
+        from random import random
+
+        self.min_size = min_size
+        self.sample_rate = sample_rate
+        self.max_sites = max_sites
+        self._random = random
+        self._lock = Lock()
+        # (operation, filename, lineno, function) -> [count, total_size,
+        # max_size, total_time]
+        self.sites: dict[tuple[str, str, int, str], list[Any]] = {}
+
+    def call(self, kind: str, cd: Sized, func: Callable[..., T],
+             *args: Any) -> T:
+        """Return ``func(*args)``, and record the time it took if the
+        operation on *cd* is sampled."""
+        size = len(cd)
+        if size < self.min_size or (self.sample_rate < 1
+                                    and self._random() >= self.sample_rate):
+            return func(*args)
+
+        start = perf_counter()
+        result = func(*args)
+        elapsed = perf_counter() - start
+
+        key = self._call_site(kind)
+        with self._lock:
+            stats = self.sites.get(key)
+            if stats is None:
+                if len(self.sites) >= self.max_sites:
+                    key = (kind, "<other>", 0, "<other>")
+                    stats = self.sites.get(key)
+                if stats is None:
+                    stats = self.sites[key] = [0, 0, 0, 0.0]
+            stats[0] += 1
+            stats[1] += size
+            stats[2] = max(stats[2], size)
+            stats[3] += elapsed
+
+        return result
+
+    @staticmethod
+    def _call_site(kind: str) -> tuple[str, str, int, str]:
+        """Return the operation and the first frame outside of this
+        package."""
+        frame = sys._getframe(2)
+        method = None
+        while frame.f_back is not None \
+                and frame.f_code.co_filename.startswith(_PACKAGE_DIR):
+            method = frame.f_code.co_name
+            frame = frame.f_back
+
+        operation = kind
+        if kind == "copy" and method is not None:
+            operation = f"copy ({method})"
+
+        return operation, frame.f_code.co_filename, frame.f_lineno, \
+            frame.f_code.co_name
+
+
+def enable_profiling(min_size: int = 10_000, sample_rate: float = 1.0,
+                     max_sites: int = 1000) -> None:
+    """Enable the profiler, which records the call sites of copies (through
+    :meth:`~constantdict.constantdict.mutate`, and therefore also
+    :meth:`~constantdict.constantdict.set`,
+    :meth:`~constantdict.constantdict.update`, ``|``, etc.) and of uncached
+    hash computations of :class:`~constantdict.constantdict` instances with
+    at least *min_size* entries.
+
+    Only a random fraction *sample_rate* of these operations is recorded,
+    which bounds the overhead. For each recorded operation, the call site
+    is the innermost stack frame outside of this package. At most
+    *max_sites* distinct call sites are kept, further ones are aggregated
+    into a single ``<other>`` entry. Calling this function again discards
+    the previously recorded statistics.
+
+    When the profiler is not enabled, the only overhead is a check of a
+    global variable per copy or uncached hash computation.
+
+    .. doctest::
+
+        >>> from constantdict import constantdict
+        >>> from constantdict.profiling import (enable_profiling,
+        ...     disable_profiling, profiling_report)
+        >>> enable_profiling(min_size=2)
+        >>> cd = constantdict(a=1, b=2).set("c", 3)
+        >>> report = profiling_report()
+        >>> report.sites[0].operation, report.sites[0].total_size
+        ('copy (set)', 2)
+        >>> disable_profiling()
+    """
+    if not 0 < sample_rate <= 1:
+        raise ValueError(f"sample_rate must be in (0, 1], not {sample_rate}")
+
+    _constantdict_module._profiler = _Profiler(min_size, sample_rate,
+                                               max_sites)
+
+
+def disable_profiling() -> None:
+    """Disable the profiler and discard its statistics, see
+    :func:`enable_profiling`."""
+    _constantdict_module._profiler = None
+
+
+def profiling_report(top: int | None = 10) -> ProfilingReport | None:
+    """Return a :class:`ProfilingReport` of the *top* call sites with the
+    largest total number of copied or hashed entries (all call sites if
+    *top* is *None*), or *None* if the profiler is not enabled."""
+    profiler = _constantdict_module._profiler
+    if profiler is None:
+        return None
+
+    with profiler._lock:
+        sites = [CallSiteStats(op, filename, lineno, function, *stats)
+                 for (op, filename, lineno, function), stats
+                 in profiler.sites.items()]
+
+    sites.sort(key=lambda site: site.total_size, reverse=True)
+    return ProfilingReport(sites[:top], profiler.min_size, profiler.sample_rate)
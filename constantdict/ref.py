@@ -0,0 +1,155 @@
+"""Atomic reference cells holding :class:`~constantdict.constantdict` snapshots."""
+
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+from collections.abc import AsyncGenerator, Callable
+from threading import Lock
+from typing import Any, Generic, Hashable, TypeVar
+
+from constantdict import constantdict
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class ConstantDictRef(Generic[K, V]):
+    """A mutable reference to an immutable
+    :class:`~constantdict.constantdict` snapshot, for publishing new
+    versions of shared state (e.g., configuration) to threads and asyncio
+    tasks.
+
+    Readers call :meth:`get`, which is a single attribute read and never
+    takes a lock, so they always see a complete snapshot. Writers compute
+    the new snapshot outside of any lock and publish it with
+    :meth:`compare_and_set`, which only succeeds if no other writer
+    published in the meantime. :meth:`swap` retries this optimistically
+    until it succeeds.
+
+    .. doctest::
+
+        >>> from constantdict import constantdict
+        >>> from constantdict.ref import ConstantDictRef
+        >>> ref = ConstantDictRef(constantdict(a=1))
+        >>> ref.swap(lambda cd: cd.set("b", 2))
+        constantdict({'a': 1, 'b': 2})
+        >>> ref.get()
+        constantdict({'a': 1, 'b': 2})
+
+    .. automethod:: get
+    .. automethod:: set
+    .. automethod:: compare_and_set
+    .. automethod:: swap
+    .. automethod:: watch
+    """
+
+    def __init__(self, value: constantdict[K, V] | None = None) -> None:
+        self._value: constantdict[K, V] = \
+            constantdict() if value is None else self._check(value)
+        # Only held by writers for the duration of a compare-and-set.
+        self._lock = Lock()
+        self._watchers: set[tuple[Any, Any]] = set()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._value!r})"
+
+    def _check(self, value: constantdict[K, V]) -> constantdict[K, V]:
+        if not isinstance(value, constantdict):
+            raise TypeError(f"{self.__class__.__name__} can only hold "
+                            f"constantdict, not '{type(value).__name__}'")
+        return value
+
+    def _notify(self) -> None:
+        for loop, event in self._watchers:
+            loop.call_soon_threadsafe(event.set)
+
+    def get(self) -> constantdict[K, V]:
+        """Return the current snapshot."""
+        return self._value
+
+    def set(self, value: constantdict[K, V]) -> constantdict[K, V]:
+        """Unconditionally publish *value* and return the previous
+        snapshot."""
+        self._check(value)
+        with self._lock:
+            old = self._value
+            self._value = value
+            self._notify()
+        return old
+
+    def compare_and_set(self, expected: constantdict[K, V],
+                        value: constantdict[K, V]) -> bool:
+        """Publish *value* if the current snapshot is *expected* (compared by
+        identity). Return whether *value* was published."""
+        self._check(value)
+        with self._lock:
+            if self._value is not expected:
+                return False
+            self._value = value
+            self._notify()
+        return True
+
+    def swap(self, func: Callable[[constantdict[K, V]], constantdict[K, V]]) \
+            -> constantdict[K, V]:
+        """Publish ``func(snapshot)`` and return it.
+
+        *func* is called without holding any lock, and is called again with
+        the new snapshot if another writer published in the meantime, so it
+        should not have side effects.
+        """
+        while True:
+            old = self._value
+            new = func(old)
+            if self.compare_and_set(old, new):
+                return new
+
+    async def watch(self) -> AsyncGenerator[constantdict[K, V], None]:
+        """Asynchronously iterate over the published snapshots, starting with
+        the current one.
+
+        Snapshots that are published (possibly from other threads) while the
+        consumer is busy are coalesced, i.e., only the latest one is yielded.
+        """
+        import asyncio
+
+        watcher = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._watchers.add(watcher)
+
+        try:
+            last = self._value
+            yield last
+            while True:
+                await watcher[1].wait()
+                watcher[1].clear()
+                value = self._value
+                if value is not last:
+                    last = value
+                    yield value
+        finally:
+            with self._lock:
+                self._watchers.discard(watcher)
@@ -0,0 +1,37 @@
+# Throughput of constantdict.batch.dedupe by number of worker threads,
+# compared to a single-threaded set of records. The threads only compute
+# in parallel on free-threaded Python builds.
+
+from __future__ import annotations
+
+import os
+import sys
+from time import perf_counter
+
+from constantdict import constantdict
+from constantdict.batch import dedupe
+
+N = 200_000
+
+
+def make_records() -> list[constantdict[str, object]]:
+    return [constantdict(user=i % (N // 2), name=f"user{i % (N // 2)}",
+                         tags=("a", "b", i % 3), score=i % 100 / 3)
+            for i in range(N)]
+
+
+gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+print(f"{N} records, {os.cpu_count()} CPUs, GIL enabled: {gil_enabled}")
+
+records = make_records()
+start = perf_counter()
+unique_set = set(records)
+print(f"  set()\t\t\t{N / (perf_counter() - start):>10.0f} records/s")
+
+for workers in (1, 2, 4, 8):
+    records = make_records()
+    start = perf_counter()
+    unique = list(dedupe(records, workers=workers))
+    elapsed = perf_counter() - start
+    assert len(unique) == len(unique_set)
+    print(f"  dedupe, {workers} workers\t{N / elapsed:>10.0f} records/s")
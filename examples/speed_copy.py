@@ -0,0 +1,35 @@
+# Speed test for copy.copy/copy.deepcopy on nested trees
+
+import copy
+from timeit import timeit
+from typing import Any, Callable, Dict
+
+from constantdict import constantdict
+
+
+def make_tree(depth: int, width: int,
+              dict_impl: Callable[[Dict[str, Any]], Any],
+              leaf: Callable[[int], Any]) -> Any:
+    if depth == 0:
+        return dict_impl({str(i): leaf(i) for i in range(width)})
+    return dict_impl({str(i): make_tree(depth - 1, width, dict_impl, leaf)
+                      for i in range(width)})
+
+
+for depth, width in ((1, 10), (2, 10), (3, 10)):
+    print(f"\n============= depth {depth}, width {width}")
+
+    trees = {
+        "dict": make_tree(depth, width, dict, int),
+        "constantdict": make_tree(depth, width, constantdict, int),
+        "constantdict (mutable leaves)":
+            make_tree(depth, width, constantdict, lambda i: [i]),
+    }
+
+    for name, tree in trees.items():
+        print(name)
+        namespace = {"copy": copy, "tree": tree}
+        print("  copy\t\t", timeit("copy.copy(tree)", number=1000,
+                                    globals=namespace))
+        print("  deepcopy\t", timeit("copy.deepcopy(tree)", number=10,
+                                     globals=namespace))
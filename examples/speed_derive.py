@@ -0,0 +1,38 @@
+# Speed test for chains of modifications: eager methods vs. derive()
+
+from __future__ import annotations
+
+from timeit import timeit
+
+from constantdict import constantdict
+
+
+def eager(cd: constantdict[str, int], keys: list[str]) -> constantdict[str, int]:
+    result = cd
+    for key in keys:
+        result = result.set(key, 0)
+    return result.delete("0").update(x=1)
+
+
+def derived(cd: constantdict[str, int], keys: list[str]) -> constantdict[str, int]:
+    result = cd.derive()
+    for key in keys:
+        result = result.set(key, 0)
+    return result.delete("0").update(x=1).finish()
+
+
+for N in (10, 1_000, 100_000):
+    print(f"\n============= {N} entries")
+
+    cd = constantdict({str(i): i for i in range(N)})
+    number = max(1, 100_000 // N)
+
+    for k in (1, 4, 16):
+        keys = [f"new{i}" for i in range(k)]
+        assert eager(cd, keys) == derived(cd, keys)
+
+        print(f"  chain of {k + 2} calls")
+        print("    eager\t", timeit("eager(cd, keys)", number=number,
+                                    globals=globals()))
+        print("    derive()\t", timeit("derived(cd, keys)", number=number,
+                                       globals=globals()))
@@ -0,0 +1,74 @@
+# GC pause times and post-fork memory with and without constantdict.frozen
+
+import gc
+import os
+import sys
+from time import perf_counter
+from typing import Any
+
+from constantdict import constantdict
+from constantdict.frozen import freeze, freeze_gc
+
+N = 500_000
+
+
+def private_dirty_kb() -> int:
+    """Return the private dirty memory of this process in kB (Linux only)."""
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Private_Dirty:"):
+                return int(line.split()[1])
+    return -1  # pragma: no cover
+
+
+def child_dirty_after_gc() -> int:
+    """Fork, run a full collection in the child, and return how much memory
+    the child had to copy from the parent."""
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        before = private_dirty_kb()
+        gc.collect()
+        os.write(w, str(private_dirty_kb() - before).encode())
+        os._exit(0)
+    os.close(w)
+    result = int(os.read(r, 64))
+    os.close(r)
+    os.waitpid(pid, 0)
+    return result
+
+
+def build_plain() -> Any:
+    return [constantdict(id=i, tags=["a", "b"], pos=[i, i]) for i in range(N)]
+
+
+def build_frozen() -> Any:
+    return [freeze({"id": i, "tags": ["a", "b"], "pos": [i, i]})
+            for i in range(N)]
+
+
+variants = {
+    "constantdict with lists": (build_plain, False),
+    "freeze()": (build_frozen, False),
+    "freeze() + freeze_gc()": (build_frozen, True),
+}
+
+for name, (build, use_freeze_gc) in variants.items():
+    print(f"\n============= {name}, {N} records")
+
+    gc.disable()
+    data = build()
+    gc.enable()
+    if use_freeze_gc:
+        freeze_gc()
+
+    start = perf_counter()
+    gc.collect()
+    print(f"  full collection\t{(perf_counter() - start) * 1000:.1f} ms")
+
+    if sys.platform == "linux":
+        print(f"  child copied after gc\t{child_dirty_after_gc()} kB")
+
+    del data
+    gc.unfreeze()
+    gc.collect()
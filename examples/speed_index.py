@@ -0,0 +1,31 @@
+# Speed test for conjunctive equality queries: full scan vs. ConstantDictIndex
+
+import random
+from timeit import timeit
+
+from constantdict import constantdict
+from constantdict.index import ConstantDictIndex
+
+random.seed(42)
+
+for N in (1_000, 100_000):
+    print(f"\n============= {N} records")
+
+    records = [constantdict(region=random.choice(("eu", "us", "asia")),
+                            tier=random.randrange(10),
+                            user=random.randrange(N // 10))
+               for _ in range(N)]
+
+    print("  build index\t", timeit("ConstantDictIndex(records)",
+                                    number=1, globals=globals()))
+
+    idx = ConstantDictIndex(records)
+    print(f"  unique records: {len(idx)}")
+
+    scan = "[r for r in records if r['region'] == 'eu' and r['tier'] == 3]"
+    query = "idx.query(region='eu', tier=3)"
+
+    assert set(eval(scan)) == eval(query)
+
+    print("  full scan\t", timeit(scan, number=10, globals=globals()))
+    print("  index query\t", timeit(query, number=10, globals=globals()))
@@ -0,0 +1,37 @@
+# Memory and lookup speed of many small constantdicts built from parsed input,
+# with and without key interning
+
+import tracemalloc
+from timeit import timeit
+from typing import Dict
+
+from constantdict import constantdict, constantdictinterned
+
+N = 100_000
+
+# Simulate parsed input: every line produces new (non-interned) key strings
+lines = [f"user_id={i},user_name=user{i},region=eu,tier={i % 5}"
+         for i in range(N)]
+
+
+def parse(line: str) -> Dict[str, str]:
+    return dict(item.split("=") for item in line.split(","))
+
+
+for dict_impl in (constantdict, constantdictinterned):
+    name = dict_impl.__name__
+    print(name)
+
+    tracemalloc.start()
+    records = [dict_impl(parse(line)) for line in lines]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"  memory\t\t {size / 1e6:.1f} MB")
+
+    # The key literal below is interned, so lookups in constantdictinterned
+    # can match keys by identity.
+    print("  lookup\t", timeit("for r in records: r['user_name']",
+                               number=10, globals=globals()))
+
+    del records
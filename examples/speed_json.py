@@ -0,0 +1,42 @@
+# Speed and memory test for decoding JSON into constantdicts:
+# json.loads(object_hook=constantdict) vs. loads_json
+
+import json
+import random
+import tracemalloc
+from timeit import timeit
+
+from constantdict import constantdict
+from constantdict.json import loads_json
+
+random.seed(42)
+
+for N in (10_000, 50_000):
+    doc = json.dumps([{"id": i,
+                       "name": f"user{i}",
+                       "region": random.choice(("eu", "us", "asia")),
+                       "tags": [random.randrange(100) for _ in range(3)],
+                       "address": {"city": "Urbana", "zip": str(61801 + i % 10)}}
+                      for i in range(N)])
+
+    print(f"\n============= {N} records, {len(doc) / 1e6:.1f} MB")
+
+    namespace = {"json": json, "constantdict": constantdict,
+                 "loads_json": loads_json, "doc": doc}
+
+    for desc, stmt in (
+            ("object_hook", "json.loads(doc, object_hook=constantdict)"),
+            ("loads_json", "loads_json(doc)"),
+            ("loads_json, interned keys", "loads_json(doc, intern_keys=True)"),
+            ("loads_json, arrays as lists",
+             "loads_json(doc, arrays_as_tuples=False)")):
+        print(f"  {desc}")
+        print("    time\t\t", timeit(stmt, number=3, globals=namespace))
+
+        tracemalloc.start()
+        result = eval(stmt, namespace)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+
+        print(f"    peak memory\t {peak / 1e6:.1f} MB")
@@ -0,0 +1,26 @@
+# Speed test for deriving modified copies: constantdict vs. constantdictoverlay
+
+from timeit import timeit
+
+from constantdict import constantdict
+from constantdict.overlay import constantdictoverlay
+
+for N in (10, 100, 1000, 10_000, 100_000):
+    print(f"\n============= {N} items")
+
+    base = constantdict({str(i): i for i in range(N)})
+    o = constantdictoverlay(base)
+    number = 1000
+
+    print("  set (constantdict)\t", timeit("base.set('0', -1)",
+                                            number=number, globals=globals()))
+    print("  set (overlay)\t\t", timeit("o.set('0', -1)",
+                                        number=number, globals=globals()))
+
+    o5 = o.set("0", -1).set("1", -1).delete("2").set("x", 1).set("y", 2)
+    cd5 = o5.compact()
+
+    print("  lookup (constantdict)\t", timeit("cd5['3']; cd5['x']",
+                                              number=number, globals=globals()))
+    print("  lookup (overlay)\t", timeit("o5['3']; o5['x']",
+                                         number=number, globals=globals()))
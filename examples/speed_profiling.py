@@ -0,0 +1,36 @@
+# Overhead of the call-site profiler for copies of small and large
+# constantdicts
+
+from timeit import timeit
+
+from constantdict import constantdict
+from constantdict.profiling import (
+    disable_profiling,
+    enable_profiling,
+    profiling_report,
+)
+
+configurations = {
+    "disabled": None,
+    "enabled, below min_size": {"min_size": 1_000_000},
+    "enabled, 1% sampled": {"min_size": 1, "sample_rate": 0.01},
+    "enabled, all sampled": {"min_size": 1},
+}
+
+for N in (10, 100_000):
+    print(f"\n============= {N} entries")
+    cd = constantdict({i: i for i in range(N)})
+    number = max(1, 1_000_000 // N)
+
+    for name, kwargs in configurations.items():
+        if kwargs is None:
+            disable_profiling()
+        else:
+            enable_profiling(**kwargs)
+
+        print(f"  {name:<25}", timeit("cd.set(-1, -1)", number=number,
+                                     globals=globals()))
+
+print()
+print(profiling_report())
+disable_profiling()
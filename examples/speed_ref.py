@@ -0,0 +1,45 @@
+# Contention benchmark for ConstantDictRef: lock-free readers and optimistic
+# writers in multiple threads
+
+import sys
+import threading
+from time import perf_counter
+
+from constantdict import constantdict
+from constantdict.ref import ConstantDictRef
+
+gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+print(f"Python {sys.version.split()[0]}, GIL enabled: {gil_enabled}")
+
+N_READS = 200_000
+N_WRITES = 2_000
+
+
+def run(nreaders: int, nwriters: int) -> None:
+    ref = ConstantDictRef(constantdict({str(i): i for i in range(100)}, n=0))
+
+    def reader() -> None:
+        for _ in range(N_READS):
+            ref.get()["n"]
+
+    def writer() -> None:
+        for _ in range(N_WRITES):
+            ref.swap(lambda d: d.set("n", d["n"] + 1))
+
+    threads = [threading.Thread(target=reader) for _ in range(nreaders)] \
+        + [threading.Thread(target=writer) for _ in range(nwriters)]
+
+    start = perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = perf_counter() - start
+
+    assert ref.get()["n"] == nwriters * N_WRITES
+    print(f"  {nreaders} readers, {nwriters} writers\t{elapsed:.3f} s")
+
+
+for nreaders, nwriters in ((1, 0), (4, 0), (0, 1), (0, 4), (4, 1), (4, 4),
+                           (8, 8)):
+    run(nreaders, nwriters)
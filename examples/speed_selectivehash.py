@@ -0,0 +1,35 @@
+# Speed test for repeated hashing: constantdictuncachedhash vs.
+# constantdictselectivehash with 1% mutable-but-hashable values
+
+from timeit import timeit
+
+from constantdict import (
+    constantdict,
+    constantdictselectivehash,
+    constantdictuncachedhash,
+)
+
+
+class Counter:
+    """A mutable object whose hash depends on its state."""
+
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+
+for N in (10, 100, 10_000, 1_000_000):
+    print(f"\n============= {N} entries")
+
+    d = {str(i): Counter(i) if i % 100 == 0 else i for i in range(N)}
+    number = max(1, 1_000_000 // N)
+
+    for cls in (constantdict, constantdictuncachedhash,
+                constantdictselectivehash):
+        cd = cls(d)
+        print(cls.__name__)
+        print("  first hash\t", timeit("hash(cd)", number=1, globals=globals()))
+        print("  later hash\t", timeit("hash(cd)", number=number,
+                                       globals=globals()))
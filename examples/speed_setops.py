@@ -0,0 +1,31 @@
+# Speed test for key-based set operations: comprehension + constantdict() vs.
+# &, -, ^
+
+from timeit import timeit
+
+from constantdict import constantdict
+
+for N, M in ((10, 10), (100_000, 100_000), (100_000, 10), (10, 100_000)):
+    print(f"\n============= {N} x {M} entries")
+
+    cd = constantdict({str(i): i for i in range(N)})
+    other = constantdict({str(i): i for i in range(N // 2, N // 2 + M)})
+    number = max(1, 1_000_000 // (N + M))
+
+    benchmarks = {
+        "&": ("constantdict({k: v for k, v in cd.items() if k in other})",
+              "cd & other"),
+        "-": ("constantdict({k: v for k, v in cd.items() if k not in other})",
+              "cd - other"),
+        "^": (("constantdict({**{k: v for k, v in cd.items() if k not in other}, "
+               "**{k: v for k, v in other.items() if k not in cd}})"),
+              "cd ^ other"),
+    }
+
+    for name, (comprehension, operator) in benchmarks.items():
+        assert eval(comprehension) == eval(operator)
+        print(name)
+        print("  comprehension\t", timeit(comprehension, number=number,
+                                          globals=globals()))
+        print("  operator\t", timeit(operator, number=number,
+                                     globals=globals()))
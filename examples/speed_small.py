@@ -0,0 +1,33 @@
+# Memory and lookup speed of small constantdicts (sizes 0-16)
+
+import tracemalloc
+from timeit import timeit
+
+from constantdict import constantdict
+
+COUNT = 10_000
+
+print("size\tdict bytes\tconstantdict bytes (hashed)\tdict lookup\t"
+      "constantdict lookup")
+
+for n in range(17):
+    items = {f"key{i}": i for i in range(n)}
+    key = f"key{n - 1}" if n else "missing"
+
+    sizes = []
+    for cls in (dict, constantdict):
+        tracemalloc.start()
+        objs = [cls(items) for _ in range(COUNT)]
+        if cls is constantdict:
+            for o in objs:
+                hash(o)
+        sizes.append(tracemalloc.get_traced_memory()[0] // COUNT)
+        tracemalloc.stop()
+        del objs
+
+    d = dict(items)
+    cd = constantdict(items)
+    t_dict = timeit("d.get(key)", number=1_000_000, globals=globals())
+    t_cd = timeit("cd.get(key)", number=1_000_000, globals=globals())
+
+    print(f"{n}\t{sizes[0]}\t\t{sizes[1]}\t\t\t\t{t_dict:.3f}\t\t{t_cd:.3f}")
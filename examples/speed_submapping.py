@@ -0,0 +1,35 @@
+# Speed test for sub-mapping tests: items views vs. issubmapping()
+
+from timeit import timeit
+
+from constantdict import constantdict
+
+for N in (1_000, 100_000, 1_000_000):
+    print(f"\n============= {N} items")
+
+    large = constantdict({str(i): i for i in range(N)})
+    large_eq = constantdict({str(i): i for i in range(N)})
+    large_neq = large.set("0", -1)
+    small = constantdict({str(i): i for i in range(0, N, 10)})
+    hash(large)
+    hash(large_eq)
+    hash(large_neq)
+
+    number = max(1, 1_000_000 // N)
+
+    cases = (
+        ("identical", "large", "large"),
+        ("equal", "large", "large_eq"),
+        ("equal size, not equal", "large_neq", "large"),
+        ("larger than other", "large", "small"),
+        ("10% subset", "small", "large"),
+    )
+
+    for desc, lhs, rhs in cases:
+        print(f"  {desc}")
+        assert (eval(f"{lhs}.items() <= {rhs}.items()")
+                == eval(f"{lhs}.issubmapping({rhs})"))
+        print("    items() <=\t", timeit(f"{lhs}.items() <= {rhs}.items()",
+                                         number=number, globals=globals()))
+        print("    issubmapping\t", timeit(f"{lhs}.issubmapping({rhs})",
+                                           number=number, globals=globals()))
@@ -0,0 +1,48 @@
+# Speed test for bulk transforms: comprehension + constantdict() vs.
+# map_values/filter_items/partition
+
+from timeit import timeit
+
+from constantdict import constantdict
+
+
+def inc(v: int) -> int:
+    return v + 1
+
+
+def identity(v: int) -> int:
+    return v
+
+
+def odd(k: str, v: int) -> bool:
+    return v % 2 == 1
+
+
+for N in (10, 1_000, 100_000):
+    print(f"\n============= {N} entries")
+
+    cd = constantdict({str(i): i for i in range(N)})
+    number = max(1, 1_000_000 // N)
+
+    benchmarks = {
+        "map_values": (
+            "constantdict({k: inc(v) for k, v in cd.items()})",
+            "cd.map_values(inc)"),
+        "map_values (identity)": (
+            "constantdict({k: identity(v) for k, v in cd.items()})",
+            "cd.map_values(identity)"),
+        "filter_items": (
+            "constantdict({k: v for k, v in cd.items() if odd(k, v)})",
+            "cd.filter_items(odd)"),
+        "partition": (
+            ("(constantdict({k: v for k, v in cd.items() if odd(k, v)}), "
+             "constantdict({k: v for k, v in cd.items() if not odd(k, v)}))"),
+            "cd.partition(odd)"),
+    }
+
+    for name, (comprehension, method) in benchmarks.items():
+        assert eval(comprehension) == eval(method)
+        print(name)
+        print("  comprehension\t", timeit(comprehension, number=number,
+                                          globals=globals()))
+        print("  method\t", timeit(method, number=number, globals=globals()))
@@ -0,0 +1,41 @@
+# Speed test for repeated identical derivations with and without the
+# transition cache
+
+from timeit import timeit
+
+from constantdict import (
+    constantdict,
+    disable_transition_cache,
+    enable_transition_cache,
+    transition_cache_info,
+)
+
+for N in (10, 1_000, 100_000):
+    print(f"\n============= {N} entries")
+
+    states = [constantdict({str(i): i for i in range(N)}, state=s)
+              for s in range(10)]
+    other = constantdict(extra=1)
+    number = max(1, 100_000 // N)
+
+    derivations = {
+        "set": "[s.set('state', 0) for s in states]",
+        "delete": "[s.delete('state') for s in states]",
+        "|": "[s | other for s in states]",
+    }
+
+    for name, expr in derivations.items():
+        stmt = f"for r in {expr}: hash(r)"
+        print(name)
+
+        disable_transition_cache()
+        print("  uncached\t", timeit(stmt, number=number, globals=globals()))
+
+        enable_transition_cache()
+        # Keep the results alive, as the cache only references them weakly.
+        results = eval(expr)
+        for r in results:
+            hash(r)
+        print("  cached\t", timeit(stmt, number=number, globals=globals()))
+        print("  ", transition_cache_info())
+        del results
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+from itertools import count
+from typing import Any
+
+import pytest
+
+from constantdict import constantdict, constantdictuncachedhash
+from constantdict.batch import dedupe, hash_many
+
+
+def _records(n: int) -> list[constantdict[str, Any]]:
+    return [constantdict(id=i % 7, name=str(i % 7), tags=(i % 7 > 3,))
+            for i in range(n)]
+
+
+@pytest.mark.parametrize("workers", [None, 1, 2])
+def test_hash_many(workers: int | None) -> None:
+    records = _records(50)
+    records.append(constantdictuncachedhash(a=1))
+
+    result = list(hash_many(records, workers=workers, chunksize=8))
+
+    assert [r for r, _ in result] == records
+    for record, h in result:
+        assert h == hash(frozenset(record.items()))
+        if type(record) is constantdict:
+            assert record._hash == h
+        else:
+            assert not hasattr(record, "_hash")
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_dedupe(workers: int) -> None:
+    records = _records(100)
+    unique = list(dedupe(records, workers=workers, chunksize=10))
+
+    assert unique == records[:7]
+    assert all(u is r for u, r in zip(unique, records))
+    assert all(u._hash == hash(frozenset(u.items())) for u in unique)
+
+    # Records are compared like in a set
+    mixed = [constantdict(a=1), constantdict(a=1.0), constantdict(a=[1]),
+             constantdict(a=[1])]
+    assert list(dedupe(mixed[:2], workers=workers)) == [mixed[0]]
+    with pytest.raises(TypeError):
+        list(dedupe(mixed, workers=workers))
+
+
+def test_dedupe_streaming() -> None:
+    # Records are read lazily from an infinite input.
+    records = (constantdict(i=i % 3) for i in count())
+    it = dedupe(records, workers=2, chunksize=4)
+    assert [next(it) for _ in range(3)] == [constantdict(i=0),
+                                            constantdict(i=1),
+                                            constantdict(i=2)]
+
+
+def test_hash_many_errors() -> None:
+    with pytest.raises(TypeError):
+        list(hash_many([{"a": 1}], workers=1))  # type: ignore[arg-type]
+    with pytest.raises(ValueError):
+        list(hash_many([], chunksize=0))
+    with pytest.raises(TypeError):
+        list(hash_many([constantdict(a=[1])], workers=2))
+
+    assert list(hash_many([])) == []
@@ -1,11 +1,25 @@
 import sys
+from typing import Any, Set
 
 import pytest
 
 from constantdict import (
+    _check_frozenset_hash,
     constantdict,
+    constantdictinterned,
+    constantdictinternedmutation,
+    constantdictmutation,
+    constantdictselectivehash,
+    constantdictselectivehashmutation,
     constantdictuncachedhash,
     constantdictuncachedhashmutation,
+    disable_transition_cache,
+    enable_transition_cache,
+    intern_key,
+    lazyconstantdict,
+    lazyconstantdictmutation,
+    lazyvalue,
+    transition_cache_info,
 )
 
 
@@ -194,9 +208,54 @@ def test_copy() -> None:
     cd: constantdict[str, int] = constantdict(a=1, b=2)
 
     assert cd.copy() == cd
-    assert cd.copy() is not cd
+    assert cd.copy() is cd
     assert isinstance(cd.copy(), constantdict)
 
+    import copy
+    assert copy.copy(cd) is cd
+
+
+def test_deepcopy() -> None:
+    import copy
+
+    # Immutable contents: no copy at all
+    cd = constantdict(a=1, b=(2, "x", frozenset({3.0})),
+                      c=constantdict(d=None, e=b"f"))
+    assert copy.deepcopy(cd) is cd
+    assert cd._immutable
+
+    # Mutable contents: only the mutable parts are copied
+    inner = constantdict(x=1)
+    cd2: constantdict[str, Any] = constantdict(a=[1, 2], b=inner, c="s")
+    cd2_copy = copy.deepcopy(cd2)
+
+    assert cd2_copy == cd2
+    assert cd2_copy is not cd2
+    assert isinstance(cd2_copy, constantdict)
+    assert cd2_copy["a"] is not cd2["a"]
+    assert cd2_copy["b"] is inner
+    assert not cd2._immutable
+
+    cd3 = constantdictuncachedhash(a=[1])
+    assert isinstance(copy.deepcopy(cd3), constantdictuncachedhash)
+
+    class MyConstantDict(constantdict[str, Any]):
+        pass
+
+    cd5 = MyConstantDict(a=[1])
+    cd5_copy = copy.deepcopy(cd5)
+    assert type(cd5_copy) is MyConstantDict
+    assert cd5_copy == cd5
+    assert cd5_copy["a"] is not cd5["a"]
+
+    # Values referring back to the constantdict itself
+    lst: list[Any] = []
+    cd4 = constantdict(a=lst)
+    lst.append(cd4)
+    cd4_copy = copy.deepcopy(cd4)
+    assert cd4_copy["a"][0] is cd4_copy
+    assert cd4_copy["a"] is not lst
+
 
 def test_hash() -> None:
     cd: constantdict[int, int] = constantdict({1: 2})
@@ -221,6 +280,51 @@ def test_hash() -> None:
             and hash(cd2) != hash(cd3))
 
 
+def test_digest() -> None:
+    cd = constantdict(a=1, b="2", c=(3.0, None, b"4"))
+
+    d = cd.digest()
+    assert isinstance(d, bytes)
+    assert len(d) == 32
+    assert cd.digest() is d  # cached
+
+    # Independent of insertion order, and of the constantdict type
+    assert constantdict(c=(3.0, None, b"4"), b="2", a=1).digest() == d
+    assert constantdictuncachedhash(cd).digest() == d
+
+    # Keys, values and their types contribute to the digest
+    digests = {
+        constantdict().digest(),
+        constantdict(a=1).digest(),
+        constantdict(b=1).digest(),
+        constantdict(a=2).digest(),
+        constantdict(a=1.0).digest(),
+        constantdict(a=True).digest(),
+        constantdict(a="1").digest(),
+        constantdict(a=b"1").digest(),
+        constantdict(a=(1,)).digest(),
+        constantdict(a=frozenset({1})).digest(),
+        constantdict(a=1j).digest(),
+        constantdict(a=None).digest(),
+        constantdict(a=constantdict(a=1)).digest(),
+        constantdict({"a": 1, 1: "a"}).digest(),
+        constantdict({"a1": ""}).digest(),
+        constantdict({"a": "", "1": ""}).digest(),
+    }
+    assert len(digests) == 16
+
+    # Values that compare equal and have the same type have the same digest
+    assert constantdict(a=0.0).digest() == constantdict(a=-0.0).digest()
+    assert (constantdict(a=frozenset({"x", "y", "z"})).digest()
+            == constantdict(a=frozenset({"z", "y", "x"})).digest())
+
+    with pytest.raises(TypeError):
+        constantdict(a=[1]).digest()
+
+    with pytest.raises(TypeError):
+        constantdict(a=(1, [2])).digest()
+
+
 def test_discard() -> None:
     cd: constantdict[str, int] = constantdict(a=1, b=2)
 
@@ -234,6 +338,481 @@ def test_discard() -> None:
     assert cd.discard("c") is cd
 
 
+def test_bulk_transforms() -> None:
+    cd = constantdict(a=1, b=2, c=3)
+
+    assert cd.map_values(lambda v: v * 10) == {"a": 10, "b": 20, "c": 30}
+    assert cd.map_values(lambda v: v) is cd
+    assert cd.map_keys(str.upper) == {"A": 1, "B": 2, "C": 3}
+    assert cd.map_keys(lambda k: k) is cd
+    # The last value wins on collisions
+    assert cd.map_keys(lambda k: "x") == {"x": 3}
+
+    assert cd.filter_items(lambda k, v: v > 1) == {"b": 2, "c": 3}
+    assert cd.filter_items(lambda k, v: k != "b") == {"a": 1, "c": 3}
+    assert cd.filter_items(lambda k, v: True) is cd
+    assert cd.filter_items(lambda k, v: False) == {}
+
+    odd, even = cd.partition(lambda k, v: v % 2)
+    assert odd == {"a": 1, "c": 3}
+    assert even == {"b": 2}
+    assert type(odd) is type(even) is constantdict
+
+    yes, no = cd.partition(lambda k, v: True)
+    assert yes is cd
+    assert no == {}
+    yes, no = cd.partition(lambda k, v: False)
+    assert yes == {}
+    assert no is cd
+
+    # The class is preserved
+    ucd = constantdictuncachedhash(a=1)
+    assert type(ucd.map_values(lambda v: v + 1)) is constantdictuncachedhash
+    assert type(ucd.filter_items(lambda k, v: False)) is constantdictuncachedhash
+    for part in ucd.partition(lambda k, v: True):
+        assert type(part) is constantdictuncachedhash
+
+    # Results are immutable
+    with pytest.raises(AttributeError):
+        cd.map_values(str)["a"] = 1
+
+
+def test_set_operations() -> None:
+    cd = constantdict(a=1, b=2, c=3)
+    other = constantdict(b=20, c=30, d=40)
+
+    assert cd & other == {"b": 2, "c": 3}
+    assert cd & {"a": 0, "b": 0, "c": 0, "d": 0} is cd
+    assert cd & {"x": 1} == {}
+    assert cd & {"a": 0} == {"a": 1}
+
+    assert cd - other == {"a": 1}
+    assert cd - {"a"} == {"b": 2, "c": 3}
+    assert cd - {"x"} is cd
+    assert cd - {"x", "y", "z", "w"} is cd
+    assert cd - cd.keys() == {}
+
+    assert cd ^ other == {"a": 1, "d": 40}
+    assert cd ^ {} is cd
+    empty: constantdict[str, int] = constantdict()
+    assert empty ^ other is other
+    assert empty ^ {"a": 1} == {"a": 1}
+    assert type(empty ^ {"a": 1}) is constantdict
+
+    assert cd.restrict(["a", "x"]) == {"a": 1}
+    assert cd.restrict("abcd") is cd
+
+    # The order of a small sequence of keys is kept, independent of the hash seed
+    big = constantdict.fromkeys("abcdefgh", 0)
+    assert list(big.restrict(["f", "a", "c", "a"])) == ["f", "a", "c"]
+    assert list(big.restrict("hgfedcbaxyz")) == list("abcdefgh")
+    assert cd.without(iter(["a", "x"])) == {"b": 2, "c": 3}
+    assert cd.without([]) is cd
+    assert cd.without("abcdef") == {}
+
+    ucd = constantdictuncachedhash(a=1, b=2)
+    assert type(ucd & {"a": 1}) is constantdictuncachedhash
+    assert type(ucd - {"a"}) is constantdictuncachedhash
+    assert type(ucd - {"a", "b", "c"}) is constantdictuncachedhash
+    assert type(ucd ^ {"c": 1}) is constantdictuncachedhash
+
+    with pytest.raises(TypeError):
+        cd & ["a"]  # type: ignore[operator]
+    with pytest.raises(TypeError):
+        cd - ["a"]  # type: ignore[operator]
+    with pytest.raises(TypeError):
+        cd ^ ["a"]  # type: ignore[operator]
+
+
+def test_nested_paths() -> None:
+    leaf = constantdict(c=1, d=2)
+    sibling = constantdict(s=1)
+    hash(sibling)
+    cd: constantdict[str, Any] = constantdict(
+        a=constantdict(b=leaf, sib=sibling), x=[1])
+
+    assert cd.get_in(("a", "b", "c")) == 1
+    assert cd.get_in(["a", "b"]) is leaf
+    assert cd.get_in(("a", "zz"), None) is None
+    assert cd.get_in(("x", "y"), 5) == 5
+    assert cd.get_in(("x", 0)) == 1
+    assert cd.get_in(("x", 5), None) is None
+    with pytest.raises(KeyError):
+        cd.get_in(("a", "zz"))
+    with pytest.raises(KeyError):
+        cd.get_in(("x", 5))
+
+    # set_in
+    cd2 = cd.set_in(("a", "b", "c"), 10)
+    assert cd2 == {"a": {"b": {"c": 10, "d": 2}, "sib": {"s": 1}}, "x": [1]}
+    assert isinstance(cd2["a"]["b"], constantdict)
+    assert cd2["a"]["sib"] is sibling
+    assert cd2["a"]["sib"]._hash == hash(sibling)
+    assert cd2["x"] is cd["x"]
+    assert cd == {"a": {"b": {"c": 1, "d": 2}, "sib": {"s": 1}}, "x": [1]}
+
+    # Unchanged values return the same instance
+    assert cd.set_in(("a", "b", "c"), 1) is cd
+    assert cd.set_in(("a", "b"), leaf) is cd
+
+    # Missing intermediate dictionaries are created
+    cd3 = cd.set_in(("new", "deep", "key"), 1)
+    assert cd3["new"] == {"deep": {"key": 1}}
+    assert isinstance(cd3["new"]["deep"], constantdict)
+
+    with pytest.raises(TypeError):
+        cd.set_in(("x", "y"), 1)
+    with pytest.raises(ValueError):
+        cd.set_in((), 1)
+
+    # update_in
+    assert cd.update_in(("a", "b", "c"), lambda v: v + 1).get_in(
+        ("a", "b", "c")) == 2
+    assert cd.update_in(("a", "b", "zz"), lambda v: v + 1, 0).get_in(
+        ("a", "b", "zz")) == 1
+    with pytest.raises(KeyError):
+        cd.update_in(("a", "b", "zz"), lambda v: v)
+
+    # delete_in
+    cd4 = cd.delete_in(("a", "b", "c"))
+    assert cd4["a"]["b"] == {"d": 2}
+    assert cd4["a"]["sib"] is sibling
+    assert cd.delete_in(("x",)) == {"a": cd["a"]}
+    with pytest.raises(KeyError):
+        cd.delete_in(("a", "zz", "c"))
+    with pytest.raises(TypeError):
+        cd.delete_in(("x", "y"))
+    with pytest.raises(ValueError, match="path must not be empty"):
+        cd.delete_in(())
+
+    # apply_paths
+    cd5 = cd.apply_paths({("a", "b", "c"): 10, ("a", "b", "e"): 5,
+                          ("a", "new"): 3, ("y",): 4})
+    assert cd5 == {"a": {"b": {"c": 10, "d": 2, "e": 5}, "sib": {"s": 1},
+                         "new": 3},
+                   "x": [1], "y": 4}
+    assert cd5["a"]["sib"] is sibling
+    assert cd.apply_paths({("a", "b", "c"): 1, ("x",): cd["x"]}) is cd
+    assert cd.apply_paths({}) is cd
+    with pytest.raises(ValueError):
+        cd.apply_paths({("a",): 1, ("a", "b"): 2})
+
+
+def test_slots() -> None:
+    import weakref
+
+    for cls in (constantdict, constantdictuncachedhash, constantdictinterned,
+                constantdictselectivehash, lazyconstantdict):
+        cd = cls(a=1)
+        hash(cd)
+        cd._has_immutable_contents()
+        assert not hasattr(cd, "__dict__")
+        assert weakref.ref(cd)() is cd
+        assert type(cd.set("b", 2)) is cls
+
+    cd = constantdict(a=1)
+    with pytest.raises(AttributeError):
+        cd.foo = 1  # type: ignore[attr-defined]
+
+
+def test_finish_subclass_layout() -> None:
+    # Subclasses without __slots__ = () have a different layout, so finish()
+    # copies instead of changing the class.
+    class mutation(constantdictmutation[str, int]):
+        pass
+
+    m = mutation(a=1)
+    cd = m.finish()
+    assert type(cd) is constantdict
+    assert cd == {"a": 1}
+    assert cd is not m
+
+    class slotted(constantdictmutation[str, int]):
+        __slots__ = ()
+
+    m2 = slotted(a=1)
+    assert m2.finish() is m2
+
+
+class _MutableHashable:
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _MutableHashable) and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+
+def test_selective_hash() -> None:
+    d: dict[Any, Any]
+    for d in ({}, {"a": 1}, {i: str(i) for i in range(100)},
+              {"a": (1, 2.5), None: frozenset({b"x"}), 3j: constantdict(b=2)},
+              {-1: -1, -2: -2}):
+        sel = constantdictselectivehash(d)
+        assert hash(sel) == hash(constantdict(d)) == hash(frozenset(d.items()))
+        if _check_frozenset_hash():
+            assert sel._partial_hash[1] == ()
+
+    m = _MutableHashable(1)
+    cd: constantdictselectivehash[str, Any] = \
+        constantdictselectivehash(a=1, b=m, c=(1, m), d=constantdict(x=m))
+    h = hash(cd)
+    assert h == hash(frozenset(cd.items()))
+    if _check_frozenset_hash():
+        # The partial hash is only cached where the hash of frozensets can be
+        # reproduced, i.e., on CPython
+        assert cd._partial_hash[1] == ("b", "c", "d")
+
+    # The hash of the mutable items is recomputed
+    m.value = 2
+    assert hash(cd) != h
+    assert hash(cd) == hash(frozenset(cd.items()))
+
+    # Mutation
+    cdm = cd.mutate()
+    assert isinstance(cdm, constantdictselectivehashmutation)
+    cdm["e"] = 5
+    cd2 = cdm.finish()
+    assert isinstance(cd2, constantdictselectivehash)
+    assert type(cd.set("e", 5)) is constantdictselectivehash
+    assert hash(cd2) == hash(frozenset(cd2.items()))
+
+    with pytest.raises(TypeError):
+        hash(constantdictselectivehash(a=[1]))
+
+
+def test_transition_cache() -> None:
+    import gc
+
+    assert transition_cache_info() is None
+    with pytest.raises(ValueError):
+        enable_transition_cache(0)
+
+    enable_transition_cache(maxsize=4)
+    try:
+        cd = constantdict(a=1, b=2)
+
+        r1 = cd.set("c", 3)
+        h = hash(r1)
+        r2 = cd.set("c", 3)
+        assert r2 is r1
+        assert r2._hash == h
+        r_int = cd.set("c", 4)
+        assert r_int is not r1
+        r_bool = cd.set("c", True)
+        assert r_bool is not r1
+        assert cd.set("c", True) is r_bool
+        assert r_bool["c"] is True
+        other_base = constantdict(a=1, b=2)
+        assert other_base.set("c", 3) is not r1
+
+        # All results are still alive, so the counts do not depend on when
+        # they are collected.
+        info = transition_cache_info()
+        assert info is not None
+        assert info.hits == 2
+        assert info.misses == 4
+        assert info.currsize == 4
+        assert info.maxsize == 4
+
+        # Arguments whose equal values are not interchangeable are not cached
+        r3 = cd.set("c", 0.0)
+        assert cd.set("c", 0.0) is not r3
+        assert str(cd.set("c", -0.0)["c"]) == "-0.0"
+        cd_any: constantdict[Any, Any] = cd
+        r4 = cd_any.set("c", (1,))
+        assert cd_any.set("c", (True,))["c"][0] is True
+        r5 = cd_any.set((1,), 0)
+        assert list(cd_any.set((True,), 0))[-1][0] is True
+        del r4, r5
+        assert cd.set("c", [1]) is not cd.set("c", [1])
+        assert cd.set("c", [1]) == {"a": 1, "b": 2, "c": [1]}
+
+        assert cd.delete("a") is cd.delete("a")
+        assert cd.delete("a") == {"b": 2}
+        with pytest.raises(KeyError):
+            cd.delete("x")
+
+        if sys.version_info >= (3, 9):
+            other = constantdict(x=1)
+            assert cd | other is cd | other
+            assert cd | other == {"a": 1, "b": 2, "x": 1}
+            assert cd | {"x": 1} is not cd | {"x": 1}
+
+        # The cache is bounded
+        for i in range(10):
+            cd.set("i", i)
+        info = transition_cache_info()
+        assert info is not None
+        assert info.currsize == 4
+
+        # Bases and results are referenced weakly
+        r = cd.set("d", 4)
+        assert cd.set("d", 4) is r
+        del r
+        gc.collect()
+        assert cd.set("d", 4) == {"a": 1, "b": 2, "d": 4}
+
+        base = constantdict(z=1)
+        base.set("y", 2)
+        del base
+        gc.collect()
+        # A new base with the same id() does not hit the stale entry
+        for _ in range(10):
+            new_base = constantdict(w=1)
+            assert new_base.set("y", 2) == {"w": 1, "y": 2}
+
+        # Re-enabling clears the cache
+        enable_transition_cache()
+        assert transition_cache_info() == (0, 0, 4096, 0)
+    finally:
+        disable_transition_cache()
+
+    assert transition_cache_info() is None
+    assert cd.set("c", 3) is not cd.set("c", 3)
+
+
+def test_derive() -> None:
+    import random
+
+    cd = constantdict(a=1, b=2, c=3)
+
+    # Empty derivations return the original
+    assert cd.derive().finish() is cd
+
+    der = cd.derive().set("a", 10).delete("b").update({"d": 4}, e=5)
+    assert der.finish() == cd.set("a", 10).delete("b").update({"d": 4}, e=5)
+    assert der.finish() is der.finish()
+    assert cd == {"a": 1, "b": 2, "c": 3}
+
+    # Reading, comparing and hashing compute the result
+    assert der["a"] == 10
+    assert "b" not in der
+    assert len(der) == 4
+    assert list(der) == ["a", "c", "d", "e"]
+    assert der == {"a": 10, "c": 3, "d": 4, "e": 5}
+    assert der == cd.derive().update(a=10, d=4, e=5).delete("b")
+    assert der != cd
+    assert hash(der) == hash(der.finish())
+    assert repr(der) == \
+        "constantdictderivation(constantdict({'a': 10, 'c': 3, 'd': 4, 'e': 5}))"
+
+    # Extending a computed derivation starts from its result
+    assert der.set("f", 6).discard("a") == {"c": 3, "d": 4, "e": 5, "f": 6}
+
+    # setdefault and discard return the same derivation if nothing changes
+    der = cd.derive().delete("a")
+    assert der.setdefault("b", 20) is der
+    assert der.discard("a") is der
+    assert der.discard("x") is der
+    assert der.setdefault("a", 20).finish() == {"b": 2, "c": 3, "a": 20}
+    assert der.set("x", 1).delete("x").finish() == {"b": 2, "c": 3}
+
+    # Errors are raised when the modification is recorded, as with constantdict
+    with pytest.raises(KeyError):
+        der.delete("a")
+    with pytest.raises(TypeError):
+        der.set([], 1)  # type: ignore[arg-type]
+    with pytest.raises(TypeError):
+        der.discard([])  # type: ignore[arg-type]
+
+    # Derivations can branch
+    base = cd.derive().set("x", 1)
+    left = base.set("y", 2)
+    right = base.delete("x")
+    assert left == {"a": 1, "b": 2, "c": 3, "x": 1, "y": 2}
+    assert right == cd
+    assert base == {"a": 1, "b": 2, "c": 3, "x": 1}
+
+    # Subclasses are preserved
+    for cls in (constantdictuncachedhash, constantdictinterned,
+                constantdictselectivehash, lazyconstantdict):
+        sub = cls(a=1, b=2).derive().set("c", 3).delete("a").finish()
+        assert type(sub) is cls
+        assert sub == {"b": 2, "c": 3}
+
+    # Random chains give the same results as the eager methods, including
+    # the order of the keys
+    rng = random.Random(42)
+    for _ in range(200):
+        eager: constantdict[int, int] = constantdict.fromkeys(range(5), 0)
+        lazy = eager.derive()
+        for _ in range(rng.randrange(10)):
+            op = rng.choice(["set", "delete", "discard", "update", "setdefault"])
+            key = rng.randrange(8)
+            if op == "delete" and key not in eager:
+                continue
+            if op == "update":
+                args: tuple[Any, ...] = ({key: -key, key + 1: key},)
+            elif op in ("delete", "discard"):
+                args = (key,)
+            else:
+                args = (key, rng.randrange(100))
+            eager = getattr(eager, op)(*args)
+            lazy = getattr(lazy, op)(*args)
+        assert list(lazy.finish().items()) == list(eager.items())
+
+
+def test_submapping() -> None:
+    from types import MappingProxyType
+
+    cd: constantdict[str, Any] = constantdict(a=1, b=[2])
+    cd_eq: constantdict[str, Any] = constantdict(b=[2], a=1)
+    cd_big: constantdict[str, Any] = constantdict(a=1, b=[2], c=3)
+    empty: constantdict[str, Any] = constantdict()
+
+    for sub, sup in ((cd, cd), (cd, cd_eq), (cd, cd_big), (empty, cd),
+                     (cd, {"a": 1, "b": [2], "c": 3}),
+                     (cd, MappingProxyType({"a": 1, "b": [2]}))):
+        assert sub.items() <= sup.items()
+        assert sub.issubmapping(sup)
+        if isinstance(sup, constantdict):
+            assert sup.issupermapping(sub)
+
+    for not_sub, not_sup in ((cd_big, cd), (cd, {"a": 1, "b": [3], "c": 3}),
+                             (cd, {"a": 1, "c": 3, "d": 4}),
+                             (cd, {"a": 1, "b": 2})):
+        assert not not_sub.items() <= not_sup.items()
+        assert not not_sub.issubmapping(not_sup)
+        if isinstance(not_sup, constantdict):
+            assert not not_sup.issupermapping(not_sub)
+
+    assert cd_big.issupermapping({"a": 1})
+    assert not cd.issupermapping({"a": 1, "b": [2], "c": 3})
+
+    # Differing cached hashes exit early
+    cd1 = constantdict(a=1, b=2)
+    cd2 = constantdict(a=1, b=3)
+    hash(cd1)
+    hash(cd2)
+    assert not cd1.issubmapping(cd2)
+    assert cd1.issubmapping(constantdict(b=2, a=1))
+    assert cd1.issupermapping(cd1)
+
+    # Values that compare equal, but are not identical
+    assert constantdict(a=1.0).issubmapping({"a": 1, "b": 2})
+
+
+def test_isdisjoint_keys() -> None:
+    cd = constantdict(a=1, b=2)
+    empty: constantdict[str, int] = constantdict()
+
+    assert cd.isdisjoint_keys({"c": 1})
+    assert cd.isdisjoint_keys({"c": 1, "d": 2, "e": 3})
+    assert not cd.isdisjoint_keys({"a": 5, "d": 2, "e": 3})
+    assert not cd.isdisjoint_keys(constantdict(b=5))
+    assert cd.isdisjoint_keys(["c", "d"])
+    assert not cd.isdisjoint_keys(iter(["c", "a"]))
+    assert not cd.isdisjoint_keys(cd)
+    assert empty.isdisjoint_keys(empty)
+    assert empty.isdisjoint_keys(cd)
+
+    for other in ({"c": 1}, {"a": 1, "x": 2, "y": 3}, ["a"], []):
+        assert cd.isdisjoint_keys(other) == cd.keys().isdisjoint(other)
+
+
 # {{{ test removed methods
 
 def test_setitem() -> None:
@@ -350,6 +929,249 @@ def test_uncached_hash() -> None:
     assert not hasattr(cdmm, "_hash")
 
 
+def _new_str(s: str) -> str:
+    # Create a new (non-interned) string object equal to *s*. This does not
+    # work for single characters, which CPython caches.
+    assert len(s) > 1
+    return "".join(list(s))
+
+
+def test_intern_key() -> None:
+    assert intern_key(_new_str("abc")) is intern_key(_new_str("abc"))
+
+    # Keys that can be referenced weakly
+    cd1 = constantdict(a=1)
+    cd2 = constantdict(a=1)
+    assert intern_key(cd1) is cd1
+    assert intern_key(cd2) is cd1
+
+    # Keys that can not be referenced weakly are returned unchanged
+    t = (1, 2)
+    assert intern_key(t) is t
+    assert intern_key(12345) == 12345
+
+    # The intern table does not keep keys alive
+    import gc
+    import weakref
+    cd3 = constantdict(x=1)
+    assert intern_key(cd3) is cd3
+    ref = weakref.ref(cd3)
+    del cd3
+    gc.collect()
+    assert ref() is None
+    cd4 = constantdict(x=1)
+    assert intern_key(cd4) is cd4
+
+
+def test_interned() -> None:
+    # On implementations other than CPython (e.g. PyPy), the id() of a str
+    # can be derived from its value, so the identity of the keys is only
+    # checked on CPython.
+    check_ids = sys.implementation.name == "cpython"
+
+    def key_ids(cd: constantdict[str, Any]) -> Set[int]:
+        return {id(k) for k in cd}
+
+    expected = {id(intern_key(k)) for k in ("aa", "bb", "cc")}
+
+    d = {_new_str("aa"): 1, _new_str("bb"): 2}
+    if check_ids:
+        assert key_ids(constantdict(d)) != {id(intern_key(k)) for k in ("aa", "bb")}
+
+    cdi: constantdictinterned[str, Any] = \
+        constantdictinterned(d, **{_new_str("cc"): 3})
+    assert cdi == {"aa": 1, "bb": 2, "cc": 3}
+    assert isinstance(cdi, constantdictinterned)
+    if check_ids:
+        assert key_ids(cdi) == expected
+    assert hash(cdi) == hash(constantdict(aa=1, bb=2, cc=3))
+
+    # All methods that add keys intern them
+    cdi2 = constantdictinterned.fromkeys([_new_str(k) for k in ("aa", "bb", "cc")],
+                                         0)
+    assert isinstance(cdi2, constantdictinterned)
+    if check_ids:
+        assert key_ids(cdi2) == expected
+
+    derived_cds = [cdi.set(_new_str("xx"), 1), cdi.update({_new_str("xx"): 1}),
+                   cdi.update([(_new_str("xx"), 1)]),  # type: ignore[arg-type]
+                   cdi.setdefault(_new_str("xx"), 1),
+                   constantdictinterned({_new_str("xx"): 1}, **cdi)]
+    if sys.version_info >= (3, 9):
+        derived_cds.append(cdi | {_new_str("xx"): 1})
+
+    for derived in derived_cds:
+        assert isinstance(derived, constantdictinterned)
+        assert derived == {"aa": 1, "bb": 2, "cc": 3, "xx": 1}
+        if check_ids:
+            assert key_ids(derived) == expected | {id(intern_key("xx"))}
+
+    assert cdi.delete("aa") == {"bb": 2, "cc": 3}
+    assert isinstance(cdi.delete("aa"), constantdictinterned)
+
+    cdm = cdi.mutate()
+    assert isinstance(cdm, constantdictinternedmutation)
+    cdm.setdefault(_new_str("yy"), 5)
+    cdm |= {_new_str("zz"): 6}
+    cdi_finished = cdm.finish()
+    assert cdi_finished == {"aa": 1, "bb": 2, "cc": 3, "yy": 5, "zz": 6}
+    if check_ids:
+        assert key_ids(cdi_finished) == \
+            expected | {id(intern_key(k)) for k in ("yy", "zz")}
+
+    import pickle
+    cdi3 = pickle.loads(pickle.dumps(cdi))
+    assert isinstance(cdi3, constantdictinterned)
+    if check_ids:
+        assert key_ids(cdi3) == expected
+
+
+def test_lazy() -> None:
+    calls: list[str] = []
+
+    def thunk(name: str, value: int) -> lazyvalue:
+        def compute() -> int:
+            calls.append(name)
+            return value
+        return lazyvalue(compute)
+
+    def make() -> lazyconstantdict[str, Any]:
+        return lazyconstantdict(a=thunk("a", 1), b=thunk("b", 2), c=3)
+
+    cd = make()
+
+    # No values are computed
+    assert len(cd) == 3
+    assert "a" in cd
+    assert "x" not in cd
+    assert list(cd) == ["a", "b", "c"]
+    assert list(cd.keys()) == ["a", "b", "c"]
+    assert cd.isdisjoint_keys({"x": 1})
+    assert cd.get("x", 42) == 42
+    assert calls == []
+    assert "lazyvalue" in repr(dict.__getitem__(cd, "a"))
+
+    # Values are computed once
+    assert cd["a"] == 1
+    assert cd.get("a") == 1
+    assert cd["a"] == 1
+    assert calls == ["a"]
+
+    # Comparisons compute values only until the result is known
+    assert cd != {"a": 2, "b": 2, "c": 3}
+    assert cd != {"a": 1, "x": 2, "c": 3}
+    assert cd != {"a": 1}
+    assert cd != 1
+    assert cd == cd
+    assert calls == ["a"]
+
+    assert cd == {"a": 1, "b": 2, "c": 3}
+    assert {"a": 1, "b": 2, "c": 3} == cd
+    assert constantdict(a=1, b=2, c=3) == cd
+    assert calls == ["a", "b"]
+
+    # Conversions see the computed values
+    calls.clear()
+    cd = make()
+    assert dict(cd) == {**cd} == {"a": 1, "b": 2, "c": 3}
+    assert calls == ["a", "b"]
+
+    cd = make()
+    assert list(cd.values()) == [1, 2, 3]
+    cd = make()
+    assert list(cd.items()) == [("a", 1), ("b", 2), ("c", 3)]
+    cd = make()
+    assert hash(cd) == hash(constantdict(a=1, b=2, c=3))
+    assert repr(make()) == "lazyconstantdict({'a': 1, 'b': 2, 'c': 3})"
+
+    import pickle
+    assert pickle.loads(pickle.dumps(make())) == {"a": 1, "b": 2, "c": 3}
+
+    # Derived dictionaries keep lazy values, and share their result
+    calls.clear()
+    cd = make()
+    cd2 = cd.set("d", 4).delete("c")
+    cd3 = cd.update({"e": 5})
+    assert isinstance(cd2, lazyconstantdict)
+    assert isinstance(cd3, lazyconstantdict)
+    assert calls == []
+
+    assert cd2 == {"a": 1, "b": 2, "d": 4}
+    assert cd3["a"] == 1
+    assert cd["a"] == 1
+    assert calls == ["a", "b"]
+
+    cdm: lazyconstantdictmutation[str, Any] = make().mutate()
+    assert isinstance(cdm, lazyconstantdictmutation)
+    assert cdm["a"] == 1
+    assert dict.__getitem__(cdm, "a") == 1
+    cdm["x"] = lazyvalue(lambda: 10)
+    assert isinstance(cdm.finish(), lazyconstantdict)
+    assert cdm["x"] == 10
+
+    # All accessors of the mutation compute values
+    cdm = make().mutate()
+    assert cdm.get("a") == 1
+    assert cdm.get("x", 42) == 42
+    assert cdm.setdefault("b", 5) == 2
+    assert cdm.setdefault("x", 5) == 5
+    assert cdm == {"a": 1, "b": 2, "c": 3, "x": 5}
+    assert cdm != {"a": 1}
+    cdm = make().mutate()
+    assert list(cdm.values()) == [1, 2, 3]
+    cdm = make().mutate()
+    assert list(cdm.items()) == [("a", 1), ("b", 2), ("c", 3)]
+    cdm = make().mutate()
+    assert dict(cdm) == {"a": 1, "b": 2, "c": 3}
+    cdm = make().mutate()
+    assert cdm.pop("a") == 1
+    assert cdm.pop("a", None) is None
+    assert cdm.popitem() == ("c", 3)
+    assert cdm.popitem() == ("b", 2)
+
+    cd4 = lazyconstantdict.fromkeys(["a", "b"], lazyvalue(lambda: 7))
+    assert isinstance(cd4, lazyconstantdict)
+    assert cd4 == {"a": 7, "b": 7}
+
+
+def test_lazy_exception_and_threads() -> None:
+    attempts = []
+
+    def fail_once() -> int:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise ValueError
+        return 5
+
+    cd: lazyconstantdict[str, Any] = lazyconstantdict(a=lazyvalue(fail_once))
+    with pytest.raises(ValueError):
+        cd["a"]
+    assert cd["a"] == 5
+    assert len(attempts) == 2
+
+    import threading
+    import time
+
+    calls = []
+
+    def slow() -> int:
+        calls.append(1)
+        time.sleep(0.05)
+        return 42
+
+    cd2: lazyconstantdict[str, Any] = lazyconstantdict(a=lazyvalue(slow))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cd2["a"]))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [42] * 8
+    assert calls == [1]
+
+
 def test_value_covariant() -> None:
     # This test is actually performed by mypy
     foo: constantdict[str, str] = constantdict(a="b")
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import gc
+import sys
+from typing import Any
+
+import pytest
+
+from constantdict import constantdict, lazyconstantdict, lazyvalue
+from constantdict.frozen import freeze, freeze_gc, gc_paused
+
+cpython_only = pytest.mark.skipif(sys.implementation.name != "cpython",
+                                  reason="untracking is CPython-specific")
+
+
+def test_freeze() -> None:
+    shared = [1, 2]
+    obj = {"a": shared, "b": shared, "c": {"d": {3, 4}}, "e": bytearray(b"x"),
+           "f": (5, shared), 6: frozenset({7})}
+    frozen = freeze(obj)
+
+    assert frozen == {"a": (1, 2), "b": (1, 2), "c": {"d": frozenset({3, 4})},
+                      "e": b"x", "f": (5, (1, 2)), 6: frozenset({7})}
+    assert type(frozen) is constantdict
+    assert type(frozen["c"]) is constantdict
+    assert frozen["a"] is frozen["b"] is frozen["f"][1]
+    hash(frozen)
+
+    # Immutable parts are returned unchanged
+    cd = constantdict(a=(1, 2), b=constantdict(c=frozenset({3})))
+    assert freeze(cd) is cd
+    t = (1, "a", None)
+    assert freeze(t) is t
+    assert freeze(1) == 1
+
+    # Unknown objects are kept, constantdict subclasses are preserved
+    o = object()
+    assert freeze([o])[0] is o
+    lcd = lazyconstantdict(a=lazyvalue(lambda: [1]))
+    frozen_lcd = freeze(lcd)
+    assert type(frozen_lcd) is lazyconstantdict
+    assert frozen_lcd == {"a": (1,)}
+
+    cyclic: list[Any] = [1]
+    cyclic.append(cyclic)
+    with pytest.raises(ValueError):
+        freeze(cyclic)
+
+
+@cpython_only
+def test_freeze_untrack() -> None:
+    o = object()
+    frozen = freeze({"a": [1, (2, 3)], "b": {"c": {3}}, "d": [o]})
+
+    assert not gc.is_tracked(frozen["a"])
+    assert not gc.is_tracked(frozen["b"])
+    assert not gc.is_tracked(frozen["b"]["c"])
+    # Containers referencing unknown objects remain tracked
+    assert gc.is_tracked(frozen["d"])
+    assert gc.is_tracked(frozen)
+
+    # Untracked constantdicts still work as usual
+    b = frozen["b"]
+    assert hash(b) == hash(constantdict(c=frozenset({3})))
+    assert b.set("x", 1) == {"c": {3}, "x": 1}
+
+    assert gc.is_tracked(freeze({"a": [1]}, untrack=False))
+    lcd = lazyconstantdict(a=1)
+    assert gc.is_tracked(freeze(lcd))
+
+
+def test_gc_paused() -> None:
+    assert gc.isenabled()
+    with gc_paused():
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+    gc.disable()
+    try:
+        with gc_paused():
+            pass
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+    try:
+        with gc_paused(freeze_after=True):
+            data = freeze([{"i": i} for i in range(10)])
+        assert gc.get_freeze_count() > len(data)
+        assert gc.isenabled()
+
+        gc.unfreeze()
+        assert freeze_gc() > 0
+    finally:
+        gc.unfreeze()
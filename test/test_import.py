@@ -0,0 +1,85 @@
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import sys
+from typing import Dict
+
+import pytest
+
+# Maximum cumulative time (in microseconds) that 'import constantdict' may take,
+# including the modules it imports. This is deliberately generous to avoid
+# spurious failures on slow CI machines.
+IMPORT_TIME_BUDGET_US = 50_000
+
+
+def _import_times(module: str) -> Dict[str, int]:
+    """Return the cumulative import times (in microseconds) of all modules
+    imported by *module* in a fresh Python process, as reported by
+    ``-X importtime``."""
+    from subprocess import run
+
+    result = run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                 capture_output=True, text=True, check=True)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative_us)
+
+    return times
+
+
+def test_import_does_not_load_metadata() -> None:
+    if sys.implementation.name != "cpython":
+        pytest.skip("-X importtime is CPython-specific")
+
+    times = _import_times("constantdict")
+
+    assert "constantdict" in times
+    assert "importlib.metadata" not in times
+    assert "importlib_metadata" not in times
+
+
+def test_import_time_budget() -> None:
+    if sys.implementation.name != "cpython":
+        pytest.skip("-X importtime is CPython-specific")
+
+    # Take the best of a few runs to reduce noise.
+    best = min(_import_times("constantdict")["constantdict"] for _ in range(3))
+
+    assert best < IMPORT_TIME_BUDGET_US, \
+        f"'import constantdict' took {best} us (budget: {IMPORT_TIME_BUDGET_US} us)"
+
+
+def test_version() -> None:
+    import constantdict
+
+    assert isinstance(constantdict.__version__, str)
+    assert constantdict.__version__ == constantdict.__version__
+
+    with pytest.raises(AttributeError):
+        constantdict.does_not_exist  # noqa: B018
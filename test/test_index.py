@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+import pytest
+
+from constantdict import constantdict
+from constantdict.index import ConstantDictIndex
+
+
+def _records() -> list[constantdict[str, object]]:
+    return [
+        constantdict(region="eu", tier=3, name="a"),
+        constantdict(region="eu", tier=1, name="b"),
+        constantdict(region="us", tier=3, name="c"),
+        constantdict(region="eu", tier=3, name="d"),
+    ]
+
+
+def test_index_query() -> None:
+    records = _records()
+    idx = ConstantDictIndex(records)
+
+    assert len(idx) == 4
+    assert list(idx) == records
+
+    assert idx.query(region="eu", tier=3) == {records[0], records[3]}
+    assert idx.query({"region": "eu"}, tier=1) == {records[1]}
+    assert idx.query(tier=3) == {records[0], records[2], records[3]}
+    assert idx.query(region="asia") == set()
+    assert idx.query(region="us", tier=1) == set()
+    assert idx.query() == set(records)
+
+    # Must give the same results as a full scan
+    for cond in ({"region": "eu"}, {"tier": 3, "name": "c"}, {"tier": 2}):
+        assert idx.query(cond) == {r for r in records
+                                   if all(r.get(k) == v for k, v in cond.items())}
+
+
+def test_index_submappings() -> None:
+    records = _records()
+    empty: constantdict[str, object] = constantdict()
+    small = constantdict(region="eu")
+    idx = ConstantDictIndex([*records, small])
+
+    assert idx.submappings({"region": "eu", "tier": 3, "name": "a"}) \
+        == {records[0], small}
+    assert idx.submappings({"region": "eu"}) == {small}
+    assert idx.submappings({"tier": 3}) == set()
+
+    idx.add(empty)
+    assert idx.submappings({}) == {empty}
+    assert idx.submappings({"tier": 3}) == {empty}
+
+
+def test_index_dedupe_discard() -> None:
+    idx: ConstantDictIndex[str, int] = ConstantDictIndex()
+
+    cd1 = constantdict(a=1, b=2)
+    cd2 = constantdict(b=2, a=1)
+
+    assert idx.add(cd1) is cd1
+    assert idx.add(cd2) is cd1
+    assert len(idx) == 1
+    assert cd2 in idx
+    assert {"a": [1]} not in idx
+    assert repr(idx) == "ConstantDictIndex([constantdict({'a': 1, 'b': 2})])"
+
+    cd3 = constantdict(a=1)
+    idx.add(cd3)
+    assert idx.query(a=1) == {cd1, cd3}
+
+    idx.discard(cd2)
+    assert cd1 not in idx
+    assert idx.query(a=1) == {cd3}
+    assert idx.query(b=2) == set()
+
+    # Discarding a record that is not present is a no-op
+    idx.discard(cd1)
+    assert len(idx) == 1
+
+    with pytest.raises(TypeError):
+        idx.add({"a": 1})  # type: ignore[arg-type]
+
+
+def test_index_lazy_import() -> None:
+    import constantdict as constantdict_module
+
+    assert constantdict_module.ConstantDictIndex is ConstantDictIndex
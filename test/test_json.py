@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import io
+import json
+from typing import Any
+
+import pytest
+
+from constantdict import constantdict
+from constantdict.json import dump_json, dumps_json, load_json, loads_json
+
+_doc = """
+{"a": 1, "b": [1, 2, [3, {"c": null}]], "d": {"e": "f", "g": [[], [[1]]]},
+ "h": 1.5, "i": true}
+"""
+
+
+def _freeze(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return constantdict({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(item) for item in obj)
+    return obj
+
+
+@pytest.mark.parametrize("intern_keys", [True, False])
+def test_loads_json(intern_keys: bool) -> None:
+    result = loads_json(_doc, intern_keys=intern_keys)
+
+    assert result == _freeze(json.loads(_doc))
+    assert isinstance(result, constantdict)
+    assert isinstance(result["d"], constantdict)
+    assert result["b"] == (1, 2, (3, constantdict(c=None)))
+    assert result["d"]["g"] == ((), ((1,),))
+    hash(result)
+
+    # Top-level arrays and scalars
+    assert loads_json("[1, [2], {}]") == (1, (2,), constantdict())
+    assert loads_json(b"17") == 17
+
+    # Extra arguments are passed to json.loads
+    from decimal import Decimal
+    assert loads_json('{"a": 1.5}', parse_float=Decimal) == {"a": Decimal("1.5")}
+
+
+def test_loads_json_intern_keys() -> None:
+    key = "".join(["some", "key"])
+    doc1 = json.dumps([{key: 1}, {key: 2}])
+    doc2 = json.dumps({key: 3})
+
+    r1 = loads_json(doc1, intern_keys=True)
+    r2 = loads_json(doc2, intern_keys=True)
+
+    k1, = r1[0].keys()
+    k2, = r1[1].keys()
+    k3, = r2.keys()
+    assert k1 is k2 is k3
+
+    # Keys are shared within a document even without interning
+    r3 = loads_json(doc1)
+    k4, = r3[0].keys()
+    k5, = r3[1].keys()
+    assert k4 is k5
+    assert k4 == k3
+
+
+def test_loads_json_arrays_as_lists() -> None:
+    result = loads_json(_doc, arrays_as_tuples=False)
+
+    assert result == json.loads(_doc, object_hook=constantdict)
+    assert isinstance(result["d"], constantdict)
+    assert isinstance(result["b"], list)
+    assert loads_json("[1, {}]", arrays_as_tuples=False) == [1, constantdict()]
+
+
+def test_dumps_json() -> None:
+    obj = loads_json(_doc)
+
+    assert json.loads(dumps_json(obj)) == json.loads(_doc)
+    assert loads_json(dumps_json(obj)) == obj
+    assert dumps_json(constantdict(b=1, a=2), sort_keys=True) == '{"a": 2, "b": 1}'
+
+    f = io.StringIO()
+    dump_json(obj, f)
+    f.seek(0)
+    assert load_json(f) == obj
+
+
+def test_json_lazy_import() -> None:
+    import constantdict as constantdict_module
+
+    assert constantdict_module.loads_json is loads_json
+    assert constantdict_module.dumps_json is dumps_json
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import sys
+from typing import Any
+
+import pytest
+
+from constantdict import constantdict, constantdictinterned
+from constantdict.memory import MemoryReport, memory_report
+
+cpython_only = pytest.mark.skipif(sys.implementation.name != "cpython",
+                                  reason="sys.getsizeof is CPython-specific")
+
+
+def _new_str(s: str) -> str:
+    return "".join(list(s))
+
+
+@cpython_only
+def test_memory_report_flat() -> None:
+    cd = constantdict({_new_str("key"): _new_str("value"),
+                       12345: (1.5, frozenset({None}))})
+    report = memory_report(cd)
+
+    assert isinstance(report, MemoryReport)
+    assert report.num_constantdicts == 1
+    assert report.containers == sys.getsizeof(cd)
+    assert report.keys == sys.getsizeof("key") + sys.getsizeof(12345)
+    assert report.values == (sys.getsizeof("value")
+                             + sys.getsizeof((1.5, frozenset({None})))
+                             + sys.getsizeof(1.5) + sys.getsizeof(frozenset({None}))
+                             + sys.getsizeof(None))
+    assert report.cache == 0
+    assert report.total == report.containers + report.keys + report.values
+    assert report.interning_savings == 0
+    assert report.sharing_savings == 0
+
+    # Cached hash values are accounted for
+    hash(cd)
+    report2 = memory_report(cd)
+    # The cache slots are part of the size of cd itself.
+    assert report2.cache == sys.getsizeof(cd._hash)
+    assert report2.total == report.total + report2.cache
+
+    # Subclasses without __slots__ have a per-instance __dict__
+    class subclass(constantdict[Any, Any]):
+        pass
+
+    cd_sub = subclass(cd)
+    hash(cd_sub)
+    report3 = memory_report(cd_sub)
+    assert report3.cache == (sys.getsizeof(cd_sub._hash)
+                             + sys.getsizeof(cd_sub.__dict__))
+
+    assert "total:" in str(report2)
+
+
+@cpython_only
+def test_memory_report_shared() -> None:
+    inner = constantdict(a=(1, 2))
+    shared = memory_report(constantdict(x=inner, y=inner))
+    unshared = memory_report(constantdict(x=inner, y=constantdict(a=(1, 2))))
+
+    assert shared.num_constantdicts == 2
+    assert unshared.num_constantdicts == 3
+    assert shared.sharing_savings == 0
+    assert unshared.sharing_savings == unshared.total - shared.total > 0
+    assert unshared.cache == 0
+
+    # Equal trees with unshared subtrees
+    outer1 = constantdict(x=constantdict(a=(1, 2)))
+    outer2 = constantdict(x=constantdict(a=(1, 2)))
+    report = memory_report((outer1, outer2))
+    report_shared = memory_report((outer1, outer1))
+    assert report.num_constantdicts == 4
+    assert report.sharing_savings == report.total - report_shared.total
+    assert report_shared.sharing_savings == 0
+    assert not hasattr(outer1, "_hash")
+
+    # Unhashable subtrees can not be shared
+    lst = [constantdict(a=[1]), constantdict(a=[1])]
+    assert memory_report(lst).sharing_savings == 0
+    assert memory_report(lst).num_constantdicts == 2
+
+
+@cpython_only
+def test_memory_report_interning() -> None:
+    records: list[dict[str, Any]] = [{_new_str("key"): i} for i in range(10)]
+
+    report = memory_report([constantdict(r) for r in records])
+    assert report.interning_savings == 9 * sys.getsizeof("key")
+
+    report_interned = memory_report([constantdictinterned(r) for r in records])
+    assert report_interned.interning_savings == 0
+    assert report.keys - report_interned.keys == report.interning_savings
+
+
+@cpython_only
+def test_memory_report_other_objects() -> None:
+    obj = {"a": [constantdict(b=1)], "c": {frozenset({2})}}
+    report = memory_report(obj)
+
+    assert report.num_constantdicts == 1
+    assert report.total == report.containers + report.keys + report.values
+
+
+def test_memory_lazy_import() -> None:
+    import constantdict as constantdict_module
+
+    assert constantdict_module.memory_report is memory_report
+
+
+def test_memory_report_not_cpython(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(sys.implementation, "name", "pypy")
+
+    with pytest.raises(NotImplementedError):
+        memory_report(constantdict(a=1))
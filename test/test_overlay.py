@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import pickle
+import random
+from typing import Any
+
+import pytest
+
+from constantdict import constantdict
+from constantdict.overlay import constantdictoverlay
+
+
+def _check_same(o: constantdictoverlay[Any, Any], cd: constantdict[Any, Any]) -> None:
+    assert o == cd
+    assert cd == o
+    assert not o != cd
+    assert list(o) == list(cd)
+    assert list(o.items()) == list(cd.items())
+    assert len(o) == len(cd)
+    assert hash(o) == hash(cd)
+    for k in cd:
+        assert k in o
+        assert o[k] == cd[k]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_overlay_random_operations(seed: int) -> None:
+    rng = random.Random(seed)
+    base = constantdict({i: i for i in range(200)})
+
+    o: constantdictoverlay[int, int] = constantdictoverlay(base)
+    cd = base
+
+    for _ in range(300):
+        op = rng.choice(["set", "delete", "discard", "update", "setdefault"])
+        key = rng.randrange(250)
+        if op == "set":
+            o, cd = o.set(key, -key), cd.set(key, -key)
+        elif op == "delete":
+            if key in cd:
+                o, cd = o.delete(key), cd.delete(key)
+            else:
+                with pytest.raises(KeyError):
+                    o.delete(key)
+        elif op == "discard":
+            o, cd = o.discard(key), cd.discard(key)
+        elif op == "update":
+            other = {key: 0, key + 1: 1}
+            o, cd = o.update(other), cd.update(other)
+        else:
+            o, cd = o.setdefault(key, 7), cd.setdefault(key, 7)
+
+        _check_same(o, cd)
+
+    # Compaction keeps the number of changes bounded
+    assert (len(o._updated) + len(o._removed) + len(o._appended)
+            <= constantdictoverlay.max_changes)
+
+
+def test_overlay_basic() -> None:
+    base = constantdict({str(i): i for i in range(100)})
+    o = constantdictoverlay(base)
+
+    assert o.compact() is base
+    _check_same(o, base)
+
+    o2 = o.set("0", 10).set("new", 1).delete("1").set("1", 11)
+    assert o2._base is base
+    assert list(o2)[-2:] == ["new", "1"]
+    _check_same(o2, base.set("0", 10).set("new", 1).delete("1").set("1", 11))
+    assert o2.compact() == o2
+    assert isinstance(o2.compact(), constantdict)
+
+    assert o2.setdefault("0", 5) is o2
+    assert o2.discard("xyz") is o2
+    assert o2.remove("new") == o2.delete("new")
+    assert "1" not in o2.delete("1")
+    with pytest.raises(KeyError):
+        o2.delete("1")["1"]
+    with pytest.raises(KeyError):
+        o2["xyz"]
+
+    assert (o2 | {"a": 1})["a"] == 1
+    assert o2.update([("a", 1)], b=2)["b"] == 2
+    with pytest.raises(TypeError):
+        o2 | 1  # type: ignore[operator]
+
+    assert o2 != {"0": 10}
+    assert o2 != 1
+    assert o2 != dict(o2, new=2)
+    assert o2 != dict(o2.delete("new"), other=1)
+    assert o2 == o2
+
+    assert repr(constantdictoverlay({"a": 1}).set("b", 2)) \
+        == "constantdictoverlay({'a': 1, 'b': 2})"
+
+    o3 = pickle.loads(pickle.dumps(o2))
+    assert isinstance(o3, constantdictoverlay)
+    _check_same(o3, o2.compact())
+
+    assert constantdictoverlay() == {}
+
+
+def test_overlay_compaction() -> None:
+    base = constantdict({i: i for i in range(1000)})
+    o = constantdictoverlay(base)
+
+    for i in range(constantdictoverlay.max_changes):
+        o = o.set(i, -i)
+    assert o._base is base
+
+    o = o.set(1000, 1000)
+    assert o._base is not base
+    assert not o._updated and not o._removed and not o._appended
+    _check_same(o, base.update({i: -i for i in range(32)}).set(1000, 1000))
+
+    # Small bases are compacted earlier
+    small = constantdictoverlay(constantdict(a=1, b=2, c=3))
+    assert small.set("d", 4)._base == {"a": 1, "b": 2, "c": 3, "d": 4}
+
+
+def test_overlay_lazy_import() -> None:
+    import constantdict as constantdict_module
+
+    assert constantdict_module.constantdictoverlay is constantdictoverlay
@@ -102,6 +102,34 @@ def _test_pickle_hash_stage2(pickle_dumps: bytes, old_hash: int) -> None:
 # }}}
 
 
+# {{{ test that the digest is stable across Python invocations
+
+_nested_data: Dict[Any, Any] = {
+    "a": 1, "b": 2.5, "c": "x", "d": b"y", "e": None, "f": True,
+    "g": (1, "2", (3.0,)), "h": frozenset({1, 2, 3}), 4: 1j,
+}
+
+
+def _nested_constantdict() -> constantdict[Any, Any]:
+    return constantdict({**_nested_data, "nested": constantdict(_nested_data)})
+
+
+def test_digest_stable() -> None:
+    cd = _nested_constantdict()
+
+    for hashseed in ("0", "1", "random"):
+        run_test_with_new_python_invocation(_test_digest_stable_stage2,
+                                            cd.digest(),
+                                            extra_env_vars={
+                                                "PYTHONHASHSEED": hashseed})
+
+
+def _test_digest_stable_stage2(old_digest: bytes) -> None:
+    assert _nested_constantdict().digest() == old_digest
+
+# }}}
+
+
 if __name__ == "__main__":
     if "INVOCATION_INFO" in os.environ:
         run_test_with_new_python_invocation_inner()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import json
+from typing import Any
+
+import pytest
+
+from constantdict import (
+    constantdict,
+    constantdictinterned,
+    constantdictselectivehash,
+    constantdictuncachedhash,
+    lazyconstantdict,
+)
+from constantdict.profiling import (
+    disable_profiling,
+    enable_profiling,
+    profiling_report,
+)
+
+
+def test_profiling() -> None:
+    assert profiling_report() is None
+    with pytest.raises(ValueError):
+        enable_profiling(sample_rate=0)
+
+    big = constantdict({i: i for i in range(100)})
+    small = constantdict(a=1)
+
+    enable_profiling(min_size=50)
+    try:
+        for _ in range(3):
+            big.set(-1, -1)
+        big.update({-2: -2})
+        small.set("b", 2)
+        hash(big)
+        hash(big)  # cached, not recorded
+
+        report = profiling_report()
+        assert report is not None
+        by_op = {site.operation: site for site in report.sites}
+        assert set(by_op) == {"copy (set)", "copy (update)", "hash"}
+
+        site = by_op["copy (set)"]
+        assert site.filename == __file__
+        assert site.function == "test_profiling"
+        assert site.count == 3
+        assert site.total_size == 300
+        assert site.max_size == 100
+        assert site.total_time > 0
+
+        assert by_op["hash"].count == 1
+        # Sorted by total size
+        assert report.sites[0] is site
+
+        assert "copy (set)" in str(report)
+        data = json.loads(report.to_json())
+        assert data["min_size"] == 50
+        assert data["sites"][0]["total_size"] == 300
+
+        top = profiling_report(top=1)
+        assert top is not None
+        assert len(top.sites) == 1
+    finally:
+        disable_profiling()
+
+    assert profiling_report() is None
+
+
+def test_profiling_variants() -> None:
+    items = {i: i for i in range(10)}
+    enable_profiling(min_size=1)
+    try:
+        for cls in (constantdictuncachedhash, constantdictinterned,
+                    constantdictselectivehash, lazyconstantdict):
+            cd: Any = cls(items)
+            cd.mutate()
+        hash(constantdictuncachedhash(items))
+
+        report = profiling_report(top=None)
+        assert report is not None
+        assert sum(site.count for site in report.sites
+                   if site.operation == "copy (mutate)") == 4
+        assert sum(site.count for site in report.sites
+                   if site.operation == "hash") == 1
+    finally:
+        disable_profiling()
+
+
+def test_profiling_sampling_and_bounds() -> None:
+    cd = constantdict(a=1)
+
+    enable_profiling(min_size=1, sample_rate=0.5)
+    try:
+        for _ in range(1000):
+            cd.set("b", 2)
+        report = profiling_report()
+        assert report is not None
+        assert 300 < report.sites[0].count < 700
+    finally:
+        disable_profiling()
+
+    enable_profiling(min_size=1, max_sites=2)
+    try:
+        cd.set("b", 2)
+        cd.set("b", 2)
+        cd.set("b", 2)
+        cd.delete("a")
+        report = profiling_report()
+        assert report is not None
+        assert len(report.sites) == 3
+        assert {(s.filename, s.count) for s in report.sites
+                if s.filename == "<other>"} == {("<other>", 2)}
+    finally:
+        disable_profiling()
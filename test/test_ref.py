@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+__copyright__ = """
+Copyright (C) 2024 University of Illinois Board of Trustees
+"""
+
+
+__license__ = """
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
+
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.
+"""
+
+
+import asyncio
+import threading
+
+import pytest
+
+from constantdict import constantdict
+from constantdict.ref import ConstantDictRef
+
+
+def test_ref_basic() -> None:
+    ref: ConstantDictRef[str, int] = ConstantDictRef()
+    assert ref.get() == {}
+    assert repr(ref) == "ConstantDictRef(constantdict({}))"
+
+    cd = constantdict(a=1)
+    assert ref.set(cd) == {}
+    assert ref.get() is cd
+
+    cd2 = cd.set("b", 2)
+    assert not ref.compare_and_set(constantdict(a=1), cd2)
+    assert ref.get() is cd
+    assert ref.compare_and_set(cd, cd2)
+    assert ref.get() is cd2
+
+    assert ref.swap(lambda d: d.delete("a")) == {"b": 2}
+    assert ref.get() == {"b": 2}
+
+    with pytest.raises(TypeError):
+        ref.set({"a": 1})  # type: ignore[arg-type]
+    with pytest.raises(TypeError):
+        ConstantDictRef({"a": 1})  # type: ignore[arg-type]
+
+
+def test_ref_swap_threads() -> None:
+    ref = ConstantDictRef(constantdict(n=0))
+    nthreads = 8
+    nincrements = 1000
+
+    def work() -> None:
+        for _ in range(nincrements):
+            ref.swap(lambda d: d.set("n", d["n"] + 1))
+
+    threads = [threading.Thread(target=work) for _ in range(nthreads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert ref.get()["n"] == nthreads * nincrements
+
+
+def test_ref_watch() -> None:
+    ref = ConstantDictRef(constantdict(v=0))
+
+    async def main() -> list[int]:
+        seen = []
+        watch = ref.watch()
+
+        async for snapshot in watch:
+            seen.append(snapshot["v"])
+            if snapshot["v"] == 0:
+                # Publish from another thread.
+                t = threading.Thread(target=ref.set, args=(constantdict(v=1),))
+                t.start()
+                t.join()
+            elif snapshot["v"] == 1:
+                # Republishing the same snapshot does not yield it again.
+                ref.set(snapshot)
+                ref.set(constantdict(v=2))
+            else:
+                break
+
+        await watch.aclose()
+        assert not ref._watchers
+        return seen
+
+    assert asyncio.run(main()) == [0, 1, 2]